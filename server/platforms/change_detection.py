@@ -0,0 +1,146 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+from platform_cache import cache_path
+
+FINGERPRINTS_DB = "fingerprints.sqlite"
+
+# A delta is only worth sending while it is clearly smaller than the full result
+MAX_DELTA_RATIO = 0.5
+
+# Keys come from usernames passed to public routes, so the store is bounded:
+# entries not updated for FINGERPRINT_TTL seconds are dropped, and beyond
+# MAX_FINGERPRINTS the least recently updated ones go first. An evicted key
+# just costs one full fetch.
+FINGERPRINT_TTL = 30 * 24 * 60 * 60
+MAX_FINGERPRINTS = 2000
+
+def fingerprint(data):
+    """
+    Returns a short content hash of raw bytes/str or of a JSON-serializable
+    value (serialized canonically, so key order doesn't matter).
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    elif not isinstance(data, (bytes, bytearray, memoryview)):
+        data = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=12).hexdigest()
+
+def compute_delta(old, new, prefix=""):
+    """
+    Diffs two results field by field, descending into nested dicts.
+
+    Returns:
+        {"set": {dotted path: new value}, "unset": [dotted paths]}. Lists are
+        compared as whole values.
+    """
+    delta = {"set": {}, "unset": []}
+    for key, value in new.items():
+        path = f"{prefix}{key}"
+        if key not in old:
+            delta["set"][path] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            nested = compute_delta(old[key], value, f"{path}.")
+            delta["set"].update(nested["set"])
+            delta["unset"].extend(nested["unset"])
+        elif old[key] != value:
+            delta["set"][path] = value
+    delta["unset"].extend(f"{prefix}{key}" for key in old if key not in new)
+    return delta
+
+class FingerprintStore:
+    """
+    Last seen raw-payload fingerprints and normalized result per fetch key
+    (e.g. "leetcode:alice"), kept in a SQLite file shared by all processes.
+    Bounded by FINGERPRINT_TTL and MAX_FINGERPRINTS (enforced on each put).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or cache_path(FINGERPRINTS_DB)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    key TEXT PRIMARY KEY,
+                    raw TEXT NOT NULL,
+                    result_hash TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS fingerprints_updated ON fingerprints (updated_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key):
+        """Returns {"raw", "resultHash", "result"} for a key, or None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT raw, result_hash, result FROM fingerprints WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {"raw": json.loads(row[0]), "resultHash": row[1], "result": json.loads(row[2])}
+
+    def put(self, key, raw, result, result_hash=None):
+        """
+        Stores a new raw fingerprint and result. The result row is only rewritten
+        when its hash changed.
+
+        Returns:
+            The result fingerprint.
+        """
+        result_hash = result_hash or fingerprint(result)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE fingerprints SET raw = ?, updated_at = ? WHERE key = ? AND result_hash = ?",
+                (json.dumps(raw), now, key, result_hash)
+            )
+            if cursor.rowcount == 0:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(raw), result_hash, json.dumps(result), now)
+                )
+            self._evict(conn, now)
+        return result_hash
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM fingerprints WHERE updated_at < ?", (now - FINGERPRINT_TTL,))
+        conn.execute(
+            "DELETE FROM fingerprints WHERE updated_at < ("
+            "SELECT updated_at FROM fingerprints ORDER BY updated_at DESC LIMIT 1 OFFSET ?)",
+            (MAX_FINGERPRINTS - 1,)
+        )
+
+def build_response(result, result_hash, since=None, previous=None):
+    """
+    Shapes a fetcher's output for a caller that already holds the result with
+    fingerprint `since`.
+
+    Returns:
+        - the plain result when `since` is None (callers without a cache),
+        - {"fingerprint", "unchanged": True} when nothing changed,
+        - {"fingerprint", "base", "delta"} when `previous` is the caller's
+          version and the delta is small,
+        - {"fingerprint", "result"} otherwise.
+    """
+    if since is None:
+        return result
+    if since == result_hash:
+        return {"fingerprint": result_hash, "unchanged": True}
+
+    if previous is not None and previous["resultHash"] == since:
+        delta = compute_delta(previous["result"], result)
+        if len(json.dumps(delta)) < MAX_DELTA_RATIO * len(json.dumps(result)):
+            return {"fingerprint": result_hash, "base": since, "delta": delta}
+
+    return {"fingerprint": result_hash, "result": result}
+
+def parse_since(args):
+    """Extracts the --since=<fingerprint> CLI option, if present."""
+    for arg in args:
+        if arg.startswith("--since="):
+            return arg.split("=", 1)[1] or None
+    return None
@@ -1,9 +1,13 @@
 import { CodeforcesUserData } from "@shared/schema";
 import { exec } from "child_process";
 import { promisify } from "util";
+import { ProfileCache } from "./fingerprint";
 
 const execAsync = promisify(exec);
 
+// Last profile per handle; the script then only reports what changed
+const codeforcesProfiles = new ProfileCache<CodeforcesUserData>();
+
 export async function fetchCodeforcesData(handle: string): Promise<CodeforcesUserData> {
   try {
     console.log(`Fetching CodeForces data for handle: ${handle}`);
@@ -55,24 +59,28 @@ export async function fetchCodeforcesData(handle: string): Promise<CodeforcesUse
     
     // Try to use the real API first for non-demo users
     try {
-      // Execute the Python script and capture its output
-      const { stdout, stderr } = await execAsync(`python3 server/platforms/codeforces_api.py "${handle}"`);
-      
-      if (stderr) {
-        console.log("API debug info:", stderr);
-      }
-      
-      if (!stdout.trim()) {
-        throw new Error("No data returned from the CodeForces API");
-      }
-      
-      // Parse the JSON output from the Python script
-      const result = JSON.parse(stdout);
-      
-      // Check if the response contains an error
-      if (result.error) {
-        throw new Error(`CodeForces API error: ${result.error}`);
-      }
+      const result = await codeforcesProfiles.fetch(handle, async (sinceArg) => {
+        // Execute the Python script and capture its output
+        const { stdout, stderr } = await execAsync(`python3 server/platforms/codeforces_api.py "${handle}"${sinceArg}`);
+        
+        if (stderr) {
+          console.log("API debug info:", stderr);
+        }
+        
+        if (!stdout.trim()) {
+          throw new Error("No data returned from the CodeForces API");
+        }
+        
+        // Parse the JSON output from the Python script
+        const output = JSON.parse(stdout);
+        
+        // Check if the response contains an error
+        if (output.error) {
+          throw new Error(`CodeForces API error: ${output.error}`);
+        }
+        
+        return output;
+      });
       
       // Make sure the result is valid
       if (!result.handle) {
@@ -119,3 +127,60 @@ export async function fetchCodeforcesData(handle: string): Promise<CodeforcesUse
     throw new Error(`Error processing CodeForces data: ${(error as Error).message}`);
   }
 }
+
+export interface CodeforcesStandingsRow {
+  handle: string;
+  participantType: string;
+  rank: number;
+  points: number;
+  penalty: number;
+  solved: string[]; // Problem indices with positive points
+  solvedAt: Record<string, number>; // Unix time of the best submission per solved index
+  version: number;
+}
+
+export interface CodeforcesStandingsPoll {
+  contestId: number;
+  version: number;
+  problems: string[];
+  changed: CodeforcesStandingsRow[];
+  removed: string[]; // "<handle>:<participantType>" keys
+  full: boolean; // Replace, rather than patch, any previously held rows
+  fetched: boolean;
+}
+
+/**
+ * Polls contest.standings for a set of handles with a single upstream request.
+ * Only rows changed since `since` are returned; polls within a few seconds of
+ * each other are served from the cached snapshot.
+ *
+ * @param contestId The Codeforces contest id
+ * @param handles Handles to include (invalid handles are dropped)
+ * @param since The last snapshot version the caller has seen
+ * @returns An empty poll, without calling Codeforces, when no valid handles remain
+ */
+export async function pollCodeforcesStandings(
+  contestId: number,
+  handles: string[],
+  since: number = 0
+): Promise<CodeforcesStandingsPoll> {
+  const safeHandles = handles.filter(h => /^[A-Za-z0-9_.-]+$/.test(h));
+  // An empty handle filter would make Codeforces return the full standings
+  if (safeHandles.length === 0) {
+    return { contestId, version: 0, problems: [], changed: [], removed: [], full: true, fetched: false };
+  }
+  const { stdout, stderr } = await execAsync(
+    `python3 server/platforms/codeforces_standings.py ${contestId} "${safeHandles.join(";")}" ${since}`
+  );
+  
+  if (stderr) {
+    console.log("Standings debug info:", stderr);
+  }
+  
+  const result = JSON.parse(stdout);
+  if (result.error) {
+    throw new Error(`Codeforces standings error: ${result.error}`);
+  }
+  
+  return result as CodeforcesStandingsPoll;
+}
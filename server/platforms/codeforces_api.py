@@ -1,17 +1,38 @@
-import requests
 import json
 import sys
-from collections import defaultdict
 import time
+import sqlite3
 
-def get_codeforces_profile(handle):
+import http_client
+from change_detection import FingerprintStore, build_response, fingerprint, parse_since
+from codeforces_problemset import ensure_fresh_snapshot, get_problemset, problem_id
+from parse_pool import submit_parse
+from platform_models import CodeforcesContestResult, CodeforcesProfile, TagCounts
+from recommendations import update_user_state
+
+# Problem rating thresholds for the medium (levelCD) and hard (levelE) buckets
+MEDIUM_RATING = 1400
+HARD_RATING = 2100
+
+# user.info fields that change without affecting the profile
+VOLATILE_USER_FIELDS = ("lastOnlineTimeSeconds",)
+
+def get_codeforces_profile(handle, since=None):
+    """
+    Fetches and normalizes a user's profile.
+    
+    Args:
+        handle: The Codeforces handle.
+        since: Fingerprint of the result the caller already holds, if any; the
+               output is then shaped by change_detection.build_response.
+    """
     # Base URL for Codeforces API
     base_url = "https://codeforces.com/api/"
     
     try:
         # Fetch user info (rating, rank, etc.)
         user_info_url = f"{base_url}user.info?handles={handle}"
-        response = requests.get(user_info_url)
+        response = http_client.get(user_info_url)
         
         if response.status_code != 200 or response.json()["status"] != "OK":
             return {"error": "Error fetching user info", "details": response.text}
@@ -21,39 +42,110 @@ def get_codeforces_profile(handle):
         # Wait a bit to avoid rate limiting
         time.sleep(0.5)
         
-        # Fetch user submissions (to calculate solved problems and tags)
-        submissions_url = f"{base_url}user.status?handle={handle}&from=1&count=100"
-        response = requests.get(submissions_url)
+        # Fetch the full submission history (to calculate solved problems and tags)
+        submissions_url = f"{base_url}user.status?handle={handle}"
+        response = http_client.get(submissions_url)
         
-        if response.status_code != 200 or response.json()["status"] != "OK":
+        if response.status_code != 200:
             return {"error": "Error fetching user submissions", "details": response.text}
         
-        submissions = response.json()["result"]
+        store = FingerprintStore()
+        key = f"codeforces:{handle.lower()}"
+        previous = store.get(key)
+        problemset_version = ensure_fresh_snapshot()
+        raw = {
+            "info": fingerprint({k: v for k, v in user_info.items() if k not in VOLATILE_USER_FIELDS}),
+            "status": fingerprint(response.content),
+            # Problem ratings and tags feed the buckets, so a new snapshot invalidates them too
+            "problemset": problemset_version
+        }
+        
+        # With the same user info, submissions and problemset snapshot, the last
+        # result's solve counts and tags still hold; only the contests can differ.
+        # The snapshot was refreshed above if stale, so it only goes unchanged
+        # past its max age while refreshes keep failing
+        reuse = (
+            previous is not None
+            and problemset_version is not None
+            and all(previous["raw"].get(part) == raw[part] for part in ("info", "status", "problemset"))
+        )
+        
+        if not reuse:
+            # Decode and process the submission history (several MB for active
+            # users) in the parse pool while the rating history is being fetched
+            processing = submit_parse(process_codeforces_payload, response.content, user_info)
         
         # Fetch user contest ratings
         ratings_url = f"{base_url}user.rating?handle={handle}"
-        response = requests.get(ratings_url)
+        response = http_client.get(ratings_url)
+        raw["rating"] = fingerprint(response.content)
+        
+        if reuse and previous["raw"].get("rating") == raw["rating"]:
+            return build_response(previous["result"], previous["resultHash"], since)
         
         contests = []
         if response.status_code == 200 and response.json()["status"] == "OK":
             ratings_data = response.json()["result"]
             # Get the most recent contests (up to 10)
             for contest in ratings_data[-10:] if len(ratings_data) > 10 else ratings_data:
-                contests.append({
-                    "contestId": contest["contestId"],
-                    "contestName": contest["contestName"],
-                    "rank": contest["rank"],
-                    "ratingChange": contest["newRating"] - contest["oldRating"]
-                })
+                contests.append(CodeforcesContestResult(
+                    contest_id=contest["contestId"],
+                    contest_name=contest["contestName"],
+                    rank=contest["rank"],
+                    rating_change=contest["newRating"] - contest["oldRating"]
+                ))
+        
+        if reuse:
+            # Solves, rating and tags are unchanged, so the recommender needs no update
+            result = {**previous["result"], "contests": [contest.to_dict() for contest in contests]}
+        else:
+            processed = processing.result()
+            if isinstance(processed, dict):
+                return processed
+            
+            profile, solved_ids = processed
+            profile.contests = tuple(contests)
+            
+            # The full history is fetched, so this is the complete solved set
+            try:
+                update_user_state("codeforces", handle, solved=solved_ids,
+                                  rating=profile.rating or None, tag_counts=profile.topics.to_dict())
+            except sqlite3.Error as e:
+                print(f"Could not update recommendation state: {e}", file=sys.stderr)
+            
+            result = profile.to_dict()
         
-        # Process the user data
-        result = process_codeforces_data(user_info, submissions, contests)
-        return result
+        result_hash = store.put(key, raw, result)
+        return build_response(result, result_hash, since, previous)
         
     except Exception as e:
         return {"error": str(e)}
 
-def process_codeforces_data(user_info, submissions, contests):
+def process_codeforces_payload(payload, user_info):
+    """
+    Decodes a raw user.status response body into a CodeforcesProfile (without
+    contests) and the tuple of solved problem ids.
+    Runs in the parse pool, so it takes the undecoded body rather than a parsed dict.
+    Returns an error dict if the API reported a failure.
+    """
+    data = json.loads(payload)
+    if data.get("status") != "OK":
+        return {"error": "Error fetching user submissions", "details": data.get("comment", "")}
+    
+    solved = collect_solved_problems(data["result"])
+    return build_codeforces_profile(user_info, data["result"], (), solved), tuple(solved)
+
+def collect_solved_problems(submissions):
+    """Returns {problem id: problem} for every distinct accepted problem."""
+    solved = {}
+    for submission in submissions:
+        if submission["verdict"] == "OK":  # Only consider accepted solutions
+            problem = submission["problem"]
+            solved.setdefault(problem_id(problem.get("contestId", 0), problem.get("index", "")), problem)
+    return solved
+
+def build_codeforces_profile(user_info, submissions, contests, solved=None):
+    """Builds a CodeforcesProfile from user.info, user.status results and CodeforcesContestResult entries."""
     # Extract general profile information
     handle = user_info.get("handle", "")
     rating = user_info.get("rating", 0)
@@ -63,47 +155,50 @@ def process_codeforces_data(user_info, submissions, contests):
     # Capitalized rank for display
     max_rank = max_rank[0].upper() + max_rank[1:] if max_rank else "Newbie"
     
-    # Process submissions to extract solved problems by category
-    solved_problems = set()
-    problem_categories = defaultdict(int)
+    # Rating and tags come from the cached problemset snapshot (O(1) lookups, no
+    # upstream calls); unrated problems fall back to the index letter.
+    problemset = get_problemset(auto_refresh=False)
     
-    for submission in submissions:
-        if submission["verdict"] == "OK":  # Only consider accepted solutions
-            problem = submission["problem"]
-            problem_id = f"{problem.get('contestId', 0)}_{problem.get('index', '')}"
-            
-            if problem_id not in solved_problems:
-                solved_problems.add(problem_id)
-                
-                # Count problems by category (e.g., difficulty level)
-                problem_index = problem.get("index", "")
-                if problem_index:
-                    category = problem_index[0]  # First letter indicates difficulty (A, B, C, etc.)
-                    problem_categories[category] += 1
+    if solved is None:
+        solved = collect_solved_problems(submissions)
     
-    # Group problems into difficulty levels
-    level_AB = 0  # Easy problems (A and B)
-    level_CD = 0  # Medium problems (C and D)
-    level_E = 0   # Hard problems (E and above)
+    topics = TagCounts()
+    level_AB = 0  # Easy problems (rated below 1400, or A and B)
+    level_CD = 0  # Medium problems (rated 1400-2099, or C and D)
+    level_E = 0   # Hard problems (rated 2100+, or E and above)
     
-    for category, count in problem_categories.items():
-        if category in ['A', 'B']:
-            level_AB += count
-        elif category in ['C', 'D']:
-            level_CD += count
+    for pid, problem in solved.items():
+        problem_rating, tags = problemset.get(pid, (problem.get("rating"), problem.get("tags", ())))
+        for tag in tags:
+            topics[tag] += 1
+        
+        if problem_rating:
+            if problem_rating < MEDIUM_RATING:
+                level_AB += 1
+            elif problem_rating < HARD_RATING:
+                level_CD += 1
+            else:
+                level_E += 1
         else:
-            level_E += count
+            category = problem.get("index", "")[:1]
+            if category in ['A', 'B']:
+                level_AB += 1
+            elif category in ['C', 'D']:
+                level_CD += 1
+            elif category:
+                level_E += 1
     
-    return {
-        "handle": handle,
-        "totalSolved": len(solved_problems),
-        "rating": rating,
-        "maxRank": max_rank,
-        "levelAB": level_AB,
-        "levelCD": level_CD,
-        "levelE": level_E,
-        "contests": contests
-    }
+    return CodeforcesProfile(
+        handle=handle,
+        total_solved=len(solved),
+        rating=rating,
+        max_rank=max_rank,
+        level_ab=level_AB,
+        level_cd=level_CD,
+        level_e=level_E,
+        contests=tuple(contests),
+        topics=topics
+    )
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -111,5 +206,5 @@ if __name__ == "__main__":
         sys.exit(1)
     
     handle = sys.argv[1]
-    result = get_codeforces_profile(handle)
+    result = get_codeforces_profile(handle, parse_since(sys.argv[2:]))
     print(json.dumps(result))
\ No newline at end of file
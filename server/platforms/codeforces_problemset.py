@@ -0,0 +1,176 @@
+import json
+import logging
+import sqlite3
+import sys
+import time
+
+import requests
+
+import http_client
+from platform_cache import cache_path
+
+PROBLEMSET_DB = "codeforces_problemset.sqlite"
+PROBLEMSET_URL = "https://codeforces.com/api/problemset.problems"
+
+# The problemset only grows after contests, so a daily refresh is plenty
+PROBLEMSET_MAX_AGE_SECONDS = 24 * 60 * 60
+# A stale snapshot is refreshed at most this often (across processes), so a
+# failing download isn't retried by every profile fetch
+REFRESH_RETRY_SECONDS = 15 * 60
+
+_problems = None
+# snapshot_version() of the snapshot _problems was loaded from
+_problems_version = None
+
+def problem_id(contest_id, index):
+    """Builds the id used by codeforces_problems.csv, e.g. "1A" or "1850B1"."""
+    return f"{contest_id}{index}"
+
+def _connect():
+    conn = sqlite3.connect(cache_path(PROBLEMSET_DB))
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS problems (
+            id TEXT PRIMARY KEY,
+            contest_id INTEGER,
+            problem_index TEXT,
+            name TEXT,
+            rating INTEGER,
+            tags TEXT
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+def snapshot_version():
+    """The snapshot's refresh timestamp, which identifies its contents, or None if there is none."""
+    with _connect() as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'refreshed_at'").fetchone()
+    return row[0] if row else None
+
+def snapshot_age():
+    """Seconds since the snapshot was last refreshed, or None if there is none."""
+    version = snapshot_version()
+    return time.time() - float(version) if version else None
+
+def _claim_refresh():
+    """Records a refresh attempt; False if another one started within REFRESH_RETRY_SECONDS."""
+    now = time.time()
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'last_attempt_at'").fetchone()
+        if row and now - float(row[0]) < REFRESH_RETRY_SECONDS:
+            return False
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_attempt_at', ?)", (str(now),))
+    return True
+
+def ensure_fresh_snapshot():
+    """
+    Refreshes a missing or stale snapshot, unless a refresh was attempted
+    within REFRESH_RETRY_SECONDS (by any process), and returns snapshot_version().
+    """
+    age = snapshot_age()
+    if (age is None or age > PROBLEMSET_MAX_AGE_SECONDS) and _claim_refresh():
+        refresh_problemset()
+    return snapshot_version()
+
+def refresh_problemset():
+    """
+    Downloads problemset.problems and replaces the on-disk snapshot.
+
+    Returns:
+        The number of problems stored, or None if the download failed.
+    """
+    global _problems
+    try:
+        response = http_client.get(PROBLEMSET_URL, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.error(f"Error fetching Codeforces problemset: {e}")
+        return None
+
+    if data.get("status") != "OK":
+        logging.error(f"Codeforces API returned status: {data.get('comment', 'Unknown Error')}")
+        return None
+
+    rows = [
+        (
+            problem_id(problem.get("contestId", 0), problem.get("index", "")),
+            problem.get("contestId", 0),
+            problem.get("index", ""),
+            problem.get("name", ""),
+            problem.get("rating"),
+            json.dumps(problem.get("tags", []))
+        )
+        for problem in data["result"]["problems"]
+    ]
+
+    with _connect() as conn:
+        conn.execute("DELETE FROM problems")
+        conn.executemany("INSERT OR REPLACE INTO problems VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('refreshed_at', ?)", (str(time.time()),))
+
+    _problems = None
+    logging.info(f"Stored {len(rows)} Codeforces problems")
+    return len(rows)
+
+def get_problemset(auto_refresh=True):
+    """
+    Returns the cached problemset as {problem id: (rating or None, tags tuple)}.
+
+    The snapshot is kept in memory and reloaded once its version changes, so
+    long-lived processes pick up refreshes made by others. With `auto_refresh`,
+    a missing or stale snapshot is refreshed first (see ensure_fresh_snapshot) -
+    at most one upstream call per PROBLEMSET_MAX_AGE_SECONDS, independent of
+    how many profiles are processed.
+    """
+    global _problems, _problems_version
+    version = ensure_fresh_snapshot() if auto_refresh else snapshot_version()
+    if _problems is not None and _problems_version == version:
+        return _problems
+
+    tag_names = {}
+    problems = {}
+    with _connect() as conn:
+        for pid, rating, tags in conn.execute("SELECT id, rating, tags FROM problems"):
+            # Share tag strings across all problems
+            problems[pid] = (rating, tuple(tag_names.setdefault(tag, sys.intern(tag)) for tag in json.loads(tags)))
+
+    _problems = problems
+    _problems_version = version
+    return problems
+
+def get_problem_details(ids):
+    """
+    Looks up names and links for a handful of problem ids straight from the snapshot.
+
+    Returns:
+        A dict mapping problem id to {"title", "link", "rating", "tags"}.
+    """
+    ids = list(ids)
+    if not ids:
+        return {}
+
+    placeholders = ",".join("?" * len(ids))
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT id, contest_id, problem_index, name, rating, tags FROM problems WHERE id IN ({placeholders})",
+            ids
+        ).fetchall()
+
+    return {
+        pid: {
+            "title": name,
+            "link": f"https://codeforces.com/problemset/problem/{contest_id}/{index}",
+            "rating": rating,
+            "tags": json.loads(tags)
+        }
+        for pid, contest_id, index, name, rating, tags in rows
+    }
+
+if __name__ == "__main__":
+    count = refresh_problemset()
+    if count is None:
+        print(json.dumps({"error": "Error fetching Codeforces problemset"}))
+        sys.exit(1)
+    print(json.dumps({"count": count}))
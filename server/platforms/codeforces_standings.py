@@ -0,0 +1,184 @@
+import hashlib
+import json
+import sys
+import time
+
+import requests
+
+import http_client
+from platform_cache import load_json, save_json
+
+STANDINGS_URL = "https://codeforces.com/api/contest.standings"
+
+# Codeforces allows roughly one call every two seconds; polls inside this
+# window are answered from the cached snapshot
+MIN_POLL_INTERVAL_SECONDS = 5
+
+def _handles_key(handles):
+    return hashlib.sha1(";".join(sorted(h.lower() for h in handles)).encode("utf-8")).hexdigest()[:16]
+
+def _snapshot_name(contest_id, handles_key):
+    # One snapshot per contest and handle set, so groups sharing a contest don't evict each other
+    return f"standings_{int(contest_id)}_{handles_key}.json"
+
+def fetch_standings(contest_id, handles):
+    """
+    Fetches contest.standings rows for the given handles in a single filtered query
+    (paging only if the handles have more rows than one page holds).
+
+    Each row's `solvedAt` maps a solved problem index to the Unix time of its
+    best submission, so callers can tell practice and virtual solves made
+    outside their own time window apart.
+
+    Returns:
+        A tuple (problem indices, {row key: row}), where the row key is
+        "<handle>:<participantType>". Without handles nothing is fetched:
+        an unfiltered query would return the whole contest's standings.
+    """
+    handles = sorted(set(handles))
+    if not handles:
+        return [], {}
+    # A handle can appear as contestant, virtual and practice participant
+    page_size = max(len(handles) * 3, 50)
+    problems = []
+    rows = {}
+    start = 1
+
+    while True:
+        params = {
+            "contestId": contest_id,
+            "handles": ";".join(handles),
+            "from": start,
+            "count": page_size,
+            "showUnofficial": "true"
+        }
+        response = http_client.get(STANDINGS_URL, params=params, timeout=15)
+        data = response.json()
+        if data.get("status") != "OK":
+            raise ValueError(data.get("comment", "Error fetching contest standings"))
+
+        result = data["result"]
+        problems = [problem["index"] for problem in result["problems"]]
+        contest_start = result["contest"].get("startTimeSeconds", 0)
+        for entry in result["rows"]:
+            party = entry["party"]
+            # Submission times are relative to the party's start (a virtual participant's own start)
+            party_start = party.get("startTimeSeconds", contest_start)
+            solved_at = {
+                problems[i]: party_start + problem_result["bestSubmissionTimeSeconds"]
+                for i, problem_result in enumerate(entry["problemResults"])
+                if problem_result["points"] > 0 and "bestSubmissionTimeSeconds" in problem_result
+            }
+            for member in party["members"]:
+                key = f"{member['handle']}:{party['participantType']}"
+                rows[key] = {
+                    "handle": member["handle"],
+                    "participantType": party["participantType"],
+                    "rank": entry["rank"],
+                    "points": entry["points"],
+                    "penalty": entry["penalty"],
+                    "solved": [
+                        problems[i] for i, problem_result in enumerate(entry["problemResults"])
+                        if problem_result["points"] > 0
+                    ],
+                    "solvedAt": solved_at
+                }
+
+        if len(result["rows"]) < page_size:
+            break
+        start += page_size
+
+    return problems, rows
+
+def poll_standings(contest_id, handles, since=0, min_interval=MIN_POLL_INTERVAL_SECONDS):
+    """
+    Returns the rows that changed since version `since` for a group's handles.
+
+    Each contest and handle set keeps a cached snapshot; every row carries
+    the snapshot version in which it last changed. Polls within `min_interval`
+    of the last fetch are served from the snapshot without an upstream request.
+
+    Returns:
+        A dict with the current version, problem indices, the changed rows,
+        the keys of removed rows, whether this is a full listing (the caller
+        should replace rather than patch its copy) and whether this call went
+        upstream.
+    """
+    if not handles:
+        return {
+            "contestId": int(contest_id),
+            "version": 0,
+            "problems": [],
+            "changed": [],
+            "removed": [],
+            "full": True,
+            "fetched": False
+        }
+
+    handles_key = _handles_key(handles)
+    name = _snapshot_name(contest_id, handles_key)
+    snapshot = load_json(name, None)
+    now = time.time()
+    fetched = False
+
+    # A new snapshot (first poll, or members joined/left) starts a fresh version sequence
+    if snapshot is None or since > snapshot["version"]:
+        since = 0
+
+    if snapshot is None or now - snapshot["fetchedAt"] >= min_interval:
+        problems, fresh_rows = fetch_standings(contest_id, handles)
+        fetched = True
+
+        old_rows = snapshot["rows"] if snapshot else {}
+        version = (snapshot["version"] if snapshot else 0) + 1
+        rows = {}
+        for key, row in fresh_rows.items():
+            old = old_rows.get(key)
+            if old is not None and all(old.get(field) == row[field] for field in ("rank", "points", "penalty", "solved", "solvedAt")):
+                rows[key] = old
+            else:
+                rows[key] = {**row, "version": version}
+
+        removed = dict(snapshot.get("removed", {})) if snapshot else {}
+        for key in old_rows.keys() - rows.keys():
+            removed[key] = version
+        for key in rows:
+            removed.pop(key, None)
+
+        # Keep the version number when nothing changed, so clients stay in sync
+        if snapshot and rows == old_rows and removed == snapshot.get("removed", {}):
+            version = snapshot["version"]
+
+        snapshot = {
+            "contestId": int(contest_id),
+            "fetchedAt": now,
+            "version": version,
+            "problems": problems,
+            "rows": rows,
+            "removed": removed
+        }
+        save_json(name, snapshot)
+
+    return {
+        "contestId": int(contest_id),
+        "version": snapshot["version"],
+        "problems": snapshot["problems"],
+        "changed": [row for row in snapshot["rows"].values() if row["version"] > since],
+        "removed": [key for key, version in snapshot["removed"].items() if version > since],
+        "full": since == 0,
+        "fetched": fetched
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(json.dumps({"error": "Usage: codeforces_standings.py <contestId> <handle;handle;...> [sinceVersion]"}))
+        sys.exit(1)
+
+    contest_id = int(sys.argv[1])
+    handles = [h for h in sys.argv[2].split(";") if h]
+    since = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    try:
+        result = poll_standings(contest_id, handles, since)
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        result = {"error": str(e)}
+    print(json.dumps(result))
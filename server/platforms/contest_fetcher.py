@@ -5,6 +5,11 @@ from datetime import datetime, timedelta, timezone
 import time
 import re
 import logging # Use logging for better error messages
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import http_client
+from parse_pool import submit_parse
+from platform_models import Contest
 
 # --- Configuration ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -51,15 +56,11 @@ def parse_gfg_time_string(time_str):
 
 # --- Platform Specific Fetchers ---
 
-def get_codeforces_contests():
-    """Fetches upcoming/ongoing contests from Codeforces API. Returns UTC datetimes."""
-    logging.info("Fetching Codeforces contests...")
+def parse_codeforces_contests(payload):
+    """Parses a raw contest.list response body into upcoming/ongoing contests. Returns UTC datetimes."""
     contests_for_calendar = []
-    url = "https://codeforces.com/api/contest.list?gym=false"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = json.loads(payload)
 
         if data['status'] == 'OK':
             for contest in data['result']:
@@ -78,21 +79,19 @@ def get_codeforces_contests():
                 start_time_utc = datetime.fromtimestamp(start_time_unix, tz=timezone.utc)
                 end_time_utc = start_time_utc + timedelta(seconds=duration_seconds)
 
-                contests_for_calendar.append({
-                    "id": f"cf-{contest['id']}",
-                    "platform": "Codeforces",
-                    "name": contest['name'],
-                    "url": f"https://codeforces.com/contest/{contest['id']}",
-                    "start_time_iso": start_time_utc.isoformat(), # ISO 8601 format with UTC offset
-                    "end_time_iso": end_time_utc.isoformat(),     # ISO 8601 format with UTC offset
-                    "duration_seconds": duration_seconds,
-                    "status": contest['phase'].capitalize() # BEFORE, CODING, PENDING_SYSTEM_TEST, SYSTEM_TEST
-                })
+                contests_for_calendar.append(Contest(
+                    id=f"cf-{contest['id']}",
+                    platform="Codeforces",
+                    name=contest['name'],
+                    url=f"https://codeforces.com/contest/{contest['id']}",
+                    start_time_iso=start_time_utc.isoformat(), # ISO 8601 format with UTC offset
+                    end_time_iso=end_time_utc.isoformat(),     # ISO 8601 format with UTC offset
+                    duration_seconds=duration_seconds,
+                    status=contest['phase'].capitalize() # BEFORE, CODING, PENDING_SYSTEM_TEST, SYSTEM_TEST
+                ))
         else:
             logging.error(f"Codeforces API returned status: {data.get('comment', 'Unknown Error')}")
 
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching Codeforces contests: {e}")
     except json.JSONDecodeError:
         logging.error("Error decoding Codeforces API response.")
     except KeyError as e:
@@ -101,18 +100,31 @@ def get_codeforces_contests():
     logging.info(f"Found {len(contests_for_calendar)} upcoming/ongoing Codeforces contests.")
     return contests_for_calendar
 
-def get_leetcode_contests():
+def fetch_codeforces_contests_payload():
+    """Downloads the raw contest.list response body. Returns None on network errors."""
+    logging.info("Fetching Codeforces contests...")
+    url = "https://codeforces.com/api/contest.list?gym=false"
+    try:
+        response = http_client.get(url, timeout=10)
+        response.raise_for_status()
+        return response.content
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error fetching Codeforces contests: {e}")
+        return None
+
+def get_codeforces_contests():
+    """Fetches upcoming/ongoing contests from Codeforces API. Returns UTC datetimes."""
+    payload = fetch_codeforces_contests_payload()
+    return parse_codeforces_contests(payload) if payload is not None else []
+
+def parse_leetcode_contests(payload):
     """
-    Fetches upcoming/ongoing contests by scraping LeetCode contest page.
+    Parses the LeetCode contest page HTML into upcoming/ongoing contests.
     Uses __NEXT_DATA__ JSON. Returns UTC datetimes.
     """
-    logging.info("Fetching LeetCode contests...")
     contests_for_calendar = []
-    url = "https://leetcode.com/contest/"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
+        soup = BeautifulSoup(payload, 'lxml')
 
         script_tag = soup.find('script', id='__NEXT_DATA__')
         if not script_tag:
@@ -167,23 +179,21 @@ def get_leetcode_contests():
                     status = "Ongoing"
                 # No need for 'Finished' status as we filter them out above
 
-                contests_for_calendar.append({
-                    "id": f"lc-{title_slug}",
-                    "platform": "LeetCode",
-                    "name": contest.get('title', 'N/A'),
-                    "url": f"https://leetcode.com/contest/{title_slug}/",
-                    "start_time_iso": start_time_utc.isoformat(),
-                    "end_time_iso": end_time_utc.isoformat(),
-                    "duration_seconds": duration_seconds,
-                    "status": status
-                })
+                contests_for_calendar.append(Contest(
+                    id=f"lc-{title_slug}",
+                    platform="LeetCode",
+                    name=contest.get('title', 'N/A'),
+                    url=f"https://leetcode.com/contest/{title_slug}/",
+                    start_time_iso=start_time_utc.isoformat(),
+                    end_time_iso=end_time_utc.isoformat(),
+                    duration_seconds=duration_seconds,
+                    status=status
+                ))
                 processed_slugs.add(title_slug)
 
         except (KeyError, TypeError, IndexError, AttributeError) as e:
             logging.error(f"Error parsing LeetCode __NEXT_DATA__ structure. It might have changed. Error: {e}", exc_info=True)
 
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching LeetCode contests page: {e}")
     except json.JSONDecodeError:
         logging.error("Error decoding LeetCode __NEXT_DATA__.")
     except Exception as e:
@@ -193,18 +203,34 @@ def get_leetcode_contests():
     logging.info(f"Found {len(contests_for_calendar)} upcoming/ongoing LeetCode contests.")
     return contests_for_calendar
 
-def get_gfg_contests():
+def fetch_leetcode_contests_payload():
+    """Downloads the LeetCode contest page HTML. Returns None on network errors."""
+    logging.info("Fetching LeetCode contests...")
+    url = "https://leetcode.com/contest/"
+    try:
+        response = http_client.get(url, headers=HEADERS, timeout=15)
+        response.raise_for_status()
+        return response.content
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error fetching LeetCode contests page: {e}")
+        return None
+
+def get_leetcode_contests():
     """
-    Fetches upcoming/ongoing contests by scraping GFG practice contest page.
+    Fetches upcoming/ongoing contests by scraping LeetCode contest page.
+    Uses __NEXT_DATA__ JSON. Returns UTC datetimes.
+    """
+    payload = fetch_leetcode_contests_payload()
+    return parse_leetcode_contests(payload) if payload is not None else []
+
+def parse_gfg_contests(payload):
+    """
+    Parses the GFG practice contest page HTML into upcoming/ongoing contests.
     Returns naive datetimes in ISO format. Timezone handling might be needed downstream.
     """
-    logging.info("Fetching GeeksforGeeks contests...")
     contests_for_calendar = []
-    url = "https://practice.geeksforgeeks.org/contests"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
+        soup = BeautifulSoup(payload, 'lxml')
 
         # Selector needs frequent verification by inspecting GFG's contest page HTML
         # This targets cards within a common structure, but is fragile.
@@ -283,44 +309,77 @@ def get_gfg_contests():
 
             # Since GFG times don't have explicit timezone, we make them into
             # ISO format strings without timezone specifiers for client interpretation
-            contests_for_calendar.append({
-                "id": unique_id,
-                "platform": "GeeksforGeeks",
-                "name": name,
-                "url": full_url,
-                "start_time_iso": start_time_naive.isoformat(), # No timezone info!
-                "end_time_iso": end_time_naive.isoformat(),     # No timezone info!
-                "duration_seconds": duration_seconds,
-                "status": status
-            })
+            contests_for_calendar.append(Contest(
+                id=unique_id,
+                platform="GeeksforGeeks",
+                name=name,
+                url=full_url,
+                start_time_iso=start_time_naive.isoformat(), # No timezone info!
+                end_time_iso=end_time_naive.isoformat(),     # No timezone info!
+                duration_seconds=duration_seconds,
+                status=status
+            ))
 
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching GFG contests page: {e}")
     except Exception as e:
         logging.error(f"An unexpected error during GFG scraping: {e}", exc_info=True)
 
     logging.info(f"Found {len(contests_for_calendar)} upcoming/ongoing GFG contests.")
     return contests_for_calendar
 
+def fetch_gfg_contests_payload():
+    """Downloads the GFG contest page HTML. Returns None on network errors."""
+    logging.info("Fetching GeeksforGeeks contests...")
+    url = "https://practice.geeksforgeeks.org/contests"
+    try:
+        response = http_client.get(url, headers=HEADERS, timeout=15)
+        response.raise_for_status()
+        return response.content
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error fetching GFG contests page: {e}")
+        return None
+
+def get_gfg_contests():
+    """
+    Fetches upcoming/ongoing contests by scraping GFG practice contest page.
+    Returns naive datetimes in ISO format. Timezone handling might be needed downstream.
+    """
+    payload = fetch_gfg_contests_payload()
+    return parse_gfg_contests(payload) if payload is not None else []
+
+# (fetch, parse) pairs for every supported platform
+PLATFORM_CONTEST_SOURCES = [
+    (fetch_codeforces_contests_payload, parse_codeforces_contests),
+    (fetch_leetcode_contests_payload, parse_leetcode_contests),
+    (fetch_gfg_contests_payload, parse_gfg_contests),
+]
+
 def get_all_platform_contests():
     """
     Fetch contests from all supported platforms and combine results.
     
+    Downloads run concurrently on threads; each raw page is parsed as soon as
+    it arrives (in the parse pool, when enabled), so parsing one platform
+    overlaps with the network I/O of the others.
+    
     Returns:
-        List of dictionaries, each representing a contest with standardized fields.
+        List of Contest objects with standardized fields.
     """
     all_contests = []
     
     try:
-        # Fetch from different platforms
-        cf_contests = get_codeforces_contests()
-        lc_contests = get_leetcode_contests()
-        gfg_contests = get_gfg_contests()
-        
-        # Combine results
-        all_contests.extend(cf_contests)
-        all_contests.extend(lc_contests)
-        all_contests.extend(gfg_contests)
+        with ThreadPoolExecutor(max_workers=len(PLATFORM_CONTEST_SOURCES)) as io_pool:
+            fetches = {io_pool.submit(fetch): i for i, (fetch, _) in enumerate(PLATFORM_CONTEST_SOURCES)}
+            parses = [None] * len(PLATFORM_CONTEST_SOURCES)
+            for fetch_future in as_completed(fetches):
+                payload = fetch_future.result()
+                if payload is not None:
+                    i = fetches[fetch_future]
+                    parses[i] = submit_parse(PLATFORM_CONTEST_SOURCES[i][1], payload)
+            
+            # Combine results in platform order
+            for parse_future in parses:
+                if parse_future is not None:
+                    all_contests.extend(parse_future.result())
         
         logging.info(f"Combined total: {len(all_contests)} contests from all platforms")
     except Exception as e:
@@ -331,4 +390,4 @@ def get_all_platform_contests():
 if __name__ == "__main__":
     # This will execute if this script is run directly
     contests = get_all_platform_contests()
-    print(json.dumps(contests, indent=2))
\ No newline at end of file
+    print(json.dumps([contest.to_dict() for contest in contests], indent=2))
\ No newline at end of file
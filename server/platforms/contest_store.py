@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from itertools import combinations
+
+from platform_cache import cache_path, load_json, save_json
+from platform_models import Contest
+
+SNAPSHOT_FILE = "contests_snapshot.json"
+FEED_DIR = "contest_feeds"
+# Contests that have not ended yet, for the "upcoming" endpoint
+UPCOMING_FEED = "upcoming.json"
+
+# GFG publishes naive times in Indian Standard Time
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Finished contests are kept this long so the calendar can still show them
+RETENTION = timedelta(days=30)
+
+# Platform slugs used by the API / shared/schema.ts, keyed by Contest.platform
+PLATFORM_SLUGS = {
+    "Codeforces": "codeforces",
+    "LeetCode": "leetcode",
+    "GeeksforGeeks": "gfg",
+}
+
+def to_utc(iso_string):
+    """Parses an ISO timestamp, treating naive (GFG) values as IST, and returns an aware UTC datetime."""
+    value = datetime.fromisoformat(iso_string)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=IST)
+    return value.astimezone(timezone.utc)
+
+def normalize_contest(contest):
+    """Returns a copy of a Contest with both timestamps expressed in UTC."""
+    start = to_utc(contest.start_time_iso)
+    end = to_utc(contest.end_time_iso)
+    return Contest(
+        id=contest.id,
+        platform=contest.platform,
+        name=contest.name,
+        url=contest.url,
+        start_time_iso=start.isoformat(),
+        end_time_iso=end.isoformat(),
+        duration_seconds=contest.duration_seconds or int((end - start).total_seconds()),
+        status=contest.status
+    )
+
+def contest_status(contest, now):
+    """
+    Status at `now` ("Upcoming", "Ongoing" or "Finished"), derived from the
+    contest's times. The status stored with a fetched contest goes stale as
+    soon as the contest starts.
+    """
+    if now < to_utc(contest.start_time_iso):
+        return "Upcoming"
+    if now < to_utc(contest.end_time_iso):
+        return "Ongoing"
+    return "Finished"
+
+def with_status(contests, now):
+    """Returns copies of contests with their status computed at `now`."""
+    return [replace(contest, status=contest_status(contest, now)) for contest in contests]
+
+def feed_key(platforms=None):
+    """Canonical feed name for a platform filter, e.g. "all" or "codeforces+leetcode"."""
+    if not platforms or set(platforms) >= set(PLATFORM_SLUGS.values()):
+        return "all"
+    return "+".join(sorted(set(platforms)))
+
+class ContestStore:
+    """
+    Contests sorted by start time, with parallel arrays of start/end epoch
+    seconds for binary search.
+
+    Overlap queries bisect the start array; since no contest is longer than
+    `max_duration`, only contests starting in [t1 - max_duration, t2) can
+    overlap [t1, t2), which keeps queries at O(log n + k).
+    """
+    __slots__ = ("contests", "starts", "ends", "max_duration")
+
+    def __init__(self, contests=()):
+        self.contests = sorted(contests, key=lambda c: (to_utc(c.start_time_iso), c.id))
+        self.starts = array('q', (int(to_utc(c.start_time_iso).timestamp()) for c in self.contests))
+        self.ends = array('q', (int(to_utc(c.end_time_iso).timestamp()) for c in self.contests))
+        self.max_duration = max((end - start for start, end in zip(self.starts, self.ends)), default=0)
+
+    def between(self, t1, t2, platforms=None):
+        """
+        Returns contests overlapping [t1, t2), optionally limited to platform slugs.
+
+        Args:
+            t1, t2: Aware datetimes or Unix timestamps.
+            platforms: Iterable of slugs ("leetcode", "codeforces", "gfg"), or None for all.
+        """
+        t1, t2 = _epoch(t1), _epoch(t2)
+        wanted = set(platforms) if platforms else None
+        lo = bisect_left(self.starts, t1 - self.max_duration)
+        hi = bisect_left(self.starts, t2)
+        return [
+            self.contests[i] for i in range(lo, hi)
+            if self.ends[i] > t1 and (wanted is None or PLATFORM_SLUGS.get(self.contests[i].platform) in wanted)
+        ]
+
+    def live(self, now=None, platforms=None):
+        """Returns contests running at `now` (defaults to the current time)."""
+        now = _epoch(now if now is not None else datetime.now(timezone.utc))
+        wanted = set(platforms) if platforms else None
+        lo = bisect_left(self.starts, now - self.max_duration)
+        hi = bisect_right(self.starts, now)
+        return [
+            self.contests[i] for i in range(lo, hi)
+            if self.ends[i] > now and (wanted is None or PLATFORM_SLUGS.get(self.contests[i].platform) in wanted)
+        ]
+
+    def upcoming(self, now=None, platforms=None):
+        """Returns contests that have not ended at `now` (defaults to the current time)."""
+        now = _epoch(now if now is not None else datetime.now(timezone.utc))
+        wanted = set(platforms) if platforms else None
+        lo = bisect_left(self.starts, now - self.max_duration)
+        return [
+            self.contests[i] for i in range(lo, len(self.contests))
+            if self.ends[i] > now and (wanted is None or PLATFORM_SLUGS.get(self.contests[i].platform) in wanted)
+        ]
+
+    def for_platforms(self, platforms=None):
+        if not platforms:
+            return list(self.contests)
+        wanted = set(platforms)
+        return [c for c in self.contests if PLATFORM_SLUGS.get(c.platform) in wanted]
+
+def _epoch(value):
+    return int(value.timestamp()) if isinstance(value, datetime) else int(value)
+
+def _ics_escape(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _ics_fold(line):
+    # RFC 5545: lines longer than 75 octets continue on the next line after a space
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Don't split a multi-byte character
+        while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+    parts.append(encoded.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+def render_ics(contests, generated_at):
+    """Renders contests as an iCalendar (RFC 5545) document."""
+    stamp = generated_at.strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//CodeTrack//Contest Calendar//EN",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:Coding Contests",
+    ]
+    for contest in contests:
+        start = to_utc(contest.start_time_iso).strftime("%Y%m%dT%H%M%SZ")
+        end = to_utc(contest.end_time_iso).strftime("%Y%m%dT%H%M%SZ")
+        lines.extend([
+            "BEGIN:VEVENT",
+            f"UID:{contest.id}@codetrack",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{start}",
+            f"DTEND:{end}",
+            f"SUMMARY:{_ics_escape(f'[{contest.platform}] {contest.name}')}",
+            f"URL:{contest.url}",
+            f"DESCRIPTION:{_ics_escape(contest.url)}",
+            "END:VEVENT",
+        ])
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_ics_fold(line) for line in lines) + "\r\n"
+
+def load_store():
+    """Loads the last saved snapshot into a ContestStore without contacting any platform."""
+    snapshot = load_json(SNAPSHOT_FILE, {})
+    return ContestStore(Contest(**contest) for contest in snapshot.get("contests", []))
+
+def write_feeds(store, generated_at):
+    """
+    Pre-renders JSON and iCalendar feeds for every combination of platforms,
+    plus the upcoming feed. Statuses are computed at `generated_at`.
+    """
+    feed_dir = cache_path(FEED_DIR)
+    os.makedirs(feed_dir, exist_ok=True)
+    feeds = {UPCOMING_FEED: json.dumps([c.to_dict() for c in with_status(store.upcoming(generated_at), generated_at)])}
+
+    slugs = sorted(PLATFORM_SLUGS.values())
+    for size in range(1, len(slugs) + 1):
+        for platforms in combinations(slugs, size):
+            key = feed_key(platforms)
+            contests = with_status(store.for_platforms(platforms), generated_at)
+            feeds[f"{key}.json"] = json.dumps([contest.to_dict() for contest in contests])
+            feeds[f"{key}.ics"] = render_ics(contests, generated_at)
+
+    for name, body in feeds.items():
+        tmp_path = os.path.join(feed_dir, f".{name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.write(body)
+        os.replace(tmp_path, os.path.join(feed_dir, name))
+
+def refresh_store(now=None):
+    """
+    Fetches contests from all platforms, merges them into the saved snapshot,
+    drops contests that ended more than RETENTION ago and re-renders every feed.
+
+    Returns:
+        The refreshed ContestStore.
+    """
+    from contest_fetcher import get_all_platform_contests
+
+    now = now or datetime.now(timezone.utc)
+    merged = {contest.id: contest for contest in load_store().contests}
+    for contest in get_all_platform_contests():
+        try:
+            merged[contest.id] = normalize_contest(contest)
+        except ValueError as e:
+            logging.warning(f"Skipping contest {contest.id} with invalid time: {e}")
+
+    cutoff = now - RETENTION
+    store = ContestStore(c for c in merged.values() if to_utc(c.end_time_iso) >= cutoff)
+
+    save_json(SNAPSHOT_FILE, {
+        "generatedAt": now.isoformat(),
+        "contests": [contest.to_dict() for contest in store.contests]
+    })
+    write_feeds(store, now)
+    logging.info(f"Contest store refreshed with {len(store.contests)} contests")
+    return store
+
+def _parse_platforms(args):
+    for arg in args:
+        if arg.startswith("--platforms="):
+            return [p for p in arg.split("=", 1)[1].split(",") if p]
+    return None
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "refresh"
+    platforms = _parse_platforms(sys.argv[2:])
+
+    if command == "refresh":
+        store = refresh_store()
+        print(json.dumps({"count": len(store.contests), "feedDir": cache_path(FEED_DIR)}))
+    elif command == "live":
+        now = datetime.now(timezone.utc)
+        print(json.dumps([c.to_dict() for c in with_status(load_store().live(now, platforms), now)]))
+    elif command == "upcoming":
+        now = datetime.now(timezone.utc)
+        print(json.dumps([c.to_dict() for c in with_status(load_store().upcoming(now, platforms), now)]))
+    elif command == "between" and len(sys.argv) >= 4:
+        start, end = to_utc(sys.argv[2]), to_utc(sys.argv[3])
+        platforms = _parse_platforms(sys.argv[4:])
+        now = datetime.now(timezone.utc)
+        print(json.dumps([c.to_dict() for c in with_status(load_store().between(start, end, platforms), now)]))
+    else:
+        print(json.dumps({"error": "Usage: contest_store.py refresh | live | upcoming [--platforms=a,b] | between <from> <to> [--platforms=a,b]"}))
+        sys.exit(1)
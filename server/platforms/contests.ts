@@ -0,0 +1,126 @@
+import fs from "fs";
+import path from "path";
+import { exec } from "child_process";
+import { promisify } from "util";
+
+const execAsync = promisify(exec);
+
+const PLATFORM_SLUGS = ["codeforces", "gfg", "leetcode"];
+
+// Must match platform_cache.CACHE_DIR / contest_store.FEED_DIR on the Python side
+const CACHE_DIR = process.env.PLATFORM_CACHE_DIR || path.join(process.cwd(), "server", "platforms", ".cache");
+const FEED_DIR = path.join(CACHE_DIR, "contest_feeds");
+// Must match contest_store.UPCOMING_FEED
+const UPCOMING_FEED_PATH = path.join(FEED_DIR, "upcoming.json");
+
+// Upstream contest lists change slowly; refresh at most this often
+export const CONTEST_FEED_MAX_AGE_MS = 30 * 60 * 1000;
+// How often the refresh timer checks the feeds' age (and retries a failed refresh)
+const CONTEST_FEED_CHECK_INTERVAL_MS = 5 * 60 * 1000;
+
+// The running refresh, shared by every caller so only one contest_store.py refresh runs at a time
+let refreshInFlight: Promise<void> | null = null;
+
+/**
+ * Returns the canonical feed name for a platform filter, mirroring contest_store.feed_key
+ *
+ * @param platforms Platform slugs ("leetcode", "codeforces", "gfg"); empty means all
+ */
+export function contestFeedKey(platforms: string[] = []): string {
+  const wanted = Array.from(new Set(platforms.filter(p => PLATFORM_SLUGS.includes(p)))).sort();
+  if (wanted.length === 0 || wanted.length === PLATFORM_SLUGS.length) {
+    return "all";
+  }
+  return wanted.join("+");
+}
+
+/**
+ * Path of the pre-rendered feed file for a platform filter and format
+ */
+export function contestFeedPath(platforms: string[], format: "json" | "ics"): string {
+  return path.join(FEED_DIR, `${contestFeedKey(platforms)}.${format}`);
+}
+
+/**
+ * Whether any feeds have been rendered yet
+ */
+export function hasContestFeeds(): boolean {
+  return fs.existsSync(UPCOMING_FEED_PATH);
+}
+
+/**
+ * Whether the pre-rendered feeds are missing or older than maxAgeMs
+ */
+export function isContestFeedStale(maxAgeMs: number = CONTEST_FEED_MAX_AGE_MS): boolean {
+  try {
+    const { mtimeMs } = fs.statSync(UPCOMING_FEED_PATH);
+    return Date.now() - mtimeMs > maxAgeMs;
+  } catch {
+    return true;
+  }
+}
+
+/**
+ * Fetches contests from all platforms and re-renders every feed via contest_store.py.
+ * Joins the refresh already running, if any. A failed refresh leaves the
+ * previous snapshot and feeds in place.
+ */
+export function refreshContestStore(): Promise<void> {
+  if (!refreshInFlight) {
+    refreshInFlight = execAsync(`python3 server/platforms/contest_store.py refresh`)
+      .then(({ stderr }) => {
+        if (stderr) {
+          console.log("Contest store debug info:", stderr);
+        }
+      })
+      .finally(() => {
+        refreshInFlight = null;
+      });
+  }
+  return refreshInFlight;
+}
+
+/**
+ * The refresh currently running, if any
+ */
+export function pendingContestRefresh(): Promise<void> | null {
+  return refreshInFlight;
+}
+
+/**
+ * Keeps the contest feeds fresh in the background: checks now and then every
+ * few minutes, refreshing once they are older than CONTEST_FEED_MAX_AGE_MS.
+ * Requests only ever read the feeds, so this is what keeps them current.
+ */
+export function startContestRefreshTimer(intervalMs: number = CONTEST_FEED_CHECK_INTERVAL_MS) {
+  const tick = () => {
+    if (isContestFeedStale()) {
+      refreshContestStore().catch(error => {
+        console.warn("Contest store refresh failed; serving the previous feeds", error);
+      });
+    }
+  };
+  tick();
+  setInterval(tick, intervalMs).unref();
+}
+
+/**
+ * Status of a contest at `now`, mirroring contest_store.contest_status
+ */
+function contestStatus(contest: { start_time_iso: string; end_time_iso: string }, now: Date): string {
+  if (now < new Date(contest.start_time_iso)) return "Upcoming";
+  if (now < new Date(contest.end_time_iso)) return "Ongoing";
+  return "Finished";
+}
+
+/**
+ * Reads contests that have not ended yet from the pre-rendered upcoming feed,
+ * without contacting any platform. The feed can be up to CONTEST_FEED_MAX_AGE_MS
+ * old, so contests that ended since are dropped and statuses are recomputed.
+ */
+export function readUpcomingContests(now: Date = new Date()): any[] {
+  const contests = JSON.parse(fs.readFileSync(UPCOMING_FEED_PATH, "utf8"));
+  return contests
+    .filter((contest: any) => new Date(contest.end_time_iso) > now)
+    .map((contest: any) => ({ ...contest, status: contestStatus(contest, now) }));
+}
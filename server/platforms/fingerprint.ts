@@ -0,0 +1,138 @@
+import type { Request, Response } from "express";
+
+/**
+ * Field-level changes between two results, as produced by
+ * change_detection.compute_delta (nested fields use dotted paths)
+ */
+export interface ProfileDelta {
+  set: Record<string, unknown>;
+  unset: string[];
+}
+
+/**
+ * Output of a platform script called with --since=<fingerprint>
+ */
+export interface FingerprintedOutput<T> {
+  fingerprint: string;
+  unchanged?: boolean;
+  base?: string;
+  delta?: ProfileDelta;
+  result?: T;
+}
+
+// Users kept per cache; the routes accept any username, so the cache must not grow unbounded
+export const PROFILE_CACHE_MAX_ENTRIES = 500;
+
+interface CachedProfile<T> {
+  fingerprint: string;
+  data: T;
+}
+
+// Fingerprint and serialized body of every result a cache has handed out, so
+// unchanged results are neither re-serialized nor re-sent
+const responseMeta = new WeakMap<object, { fingerprint: string; body?: string }>();
+
+/**
+ * Applies a delta to a copy of a result.
+ */
+export function applyDelta<T extends object>(base: T, delta: ProfileDelta): T {
+  const copy = structuredClone(base) as Record<string, any>;
+
+  const resolve = (path: string) => {
+    const keys = path.split(".");
+    let target = copy;
+    for (const key of keys.slice(0, -1)) {
+      if (typeof target[key] !== "object" || target[key] === null) {
+        target[key] = {};
+      }
+      target = target[key];
+    }
+    return { target, key: keys[keys.length - 1] };
+  };
+
+  for (const [path, value] of Object.entries(delta.set)) {
+    const { target, key } = resolve(path);
+    target[key] = value;
+  }
+  for (const path of delta.unset) {
+    const { target, key } = resolve(path);
+    delete target[key];
+  }
+
+  return copy as T;
+}
+
+/**
+ * Keeps the last result per user of a platform script, so the script only has
+ * to report whether (and which fields of) the result changed.
+ * The least recently used users are evicted beyond `maxEntries`.
+ */
+export class ProfileCache<T extends object> {
+  // Map iteration follows insertion order, so the first key is the least recently used
+  private entries = new Map<string, CachedProfile<T>>();
+
+  constructor(private maxEntries: number = PROFILE_CACHE_MAX_ENTRIES) {}
+
+  private remember(cacheKey: string, entry: CachedProfile<T>) {
+    this.entries.delete(cacheKey);
+    this.entries.set(cacheKey, entry);
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value!);
+    }
+  }
+
+  /**
+   * Runs a platform script with the --since argument for a user and returns the full result.
+   * `run` receives the argument to append to the command and returns the parsed output.
+   * Outputs without a fingerprint (e.g. errors) are returned as they are.
+   */
+  async fetch(key: string, run: (sinceArg: string) => Promise<any>): Promise<T> {
+    const cacheKey = key.toLowerCase();
+    const cached = this.entries.get(cacheKey);
+    // Always pass --since, so even the first reply carries a fingerprint
+    const output = await run(` --since=${cached?.fingerprint ?? "none"}`);
+    if (!output || typeof output.fingerprint !== "string") {
+      return output as T;
+    }
+
+    // Re-read the entry: a concurrent fetch for the same user may have replaced it
+    const current = this.entries.get(cacheKey);
+    let data: T;
+    if (output.unchanged && current?.fingerprint === output.fingerprint) {
+      this.remember(cacheKey, current);
+      return current.data;
+    } else if (output.delta && current?.fingerprint === output.base) {
+      data = applyDelta(current.data, output.delta);
+    } else if (output.result) {
+      data = output.result as T;
+    } else {
+      // Our copy no longer matches what the script diffed against; ask for the full result
+      this.entries.delete(cacheKey);
+      return this.fetch(key, run);
+    }
+
+    this.remember(cacheKey, { fingerprint: output.fingerprint, data });
+    responseMeta.set(data, { fingerprint: output.fingerprint });
+    return data;
+  }
+}
+
+/**
+ * Sends a platform result, answering 304 when the client already holds it
+ * and reusing the serialized body of results that did not change.
+ */
+export function sendProfile(req: Request, res: Response, data: object) {
+  const meta = responseMeta.get(data);
+  if (!meta) {
+    return res.json(data);
+  }
+
+  const etag = `"${meta.fingerprint}"`;
+  res.set("ETag", etag);
+  if (req.headers["if-none-match"] === etag) {
+    return res.status(304).end();
+  }
+
+  meta.body ??= JSON.stringify(data);
+  return res.type("application/json").send(meta.body);
+}
@@ -1,9 +1,13 @@
 import { GFGUserData } from "@shared/schema";
 import { exec } from "child_process";
 import { promisify } from "util";
+import { ProfileCache } from "./fingerprint";
 
 const execAsync = promisify(exec);
 
+// Last profile per user; the script then only reports what changed
+const gfgProfiles = new ProfileCache<GFGUserData>();
+
 export async function fetchGFGData(username: string): Promise<GFGUserData> {
   try {
     console.log(`Fetching GeeksForGeeks data for user: ${username}`);
@@ -37,26 +41,28 @@ export async function fetchGFGData(username: string): Promise<GFGUserData> {
     
     // Try the real scraper for non-demo users
     try {
-      // Execute the Python script and capture its output
-      const { stdout, stderr } = await execAsync(`python3 server/platforms/gfg_scraper.py "${username}"`);
-      
-      if (stderr) {
-        console.log("Scraper debug info:", stderr);
-      }
-      
-      if (!stdout.trim()) {
-        throw new Error("No data returned from the GFG scraper");
-      }
-      
-      // Parse the JSON output from the Python script
-      const result = JSON.parse(stdout);
-      
-      // Check if the response contains an error
-      if (result.error) {
-        throw new Error(`GFG scraper error: ${result.error}`);
-      }
-      
-      return result;
+      return await gfgProfiles.fetch(username, async (sinceArg) => {
+        // Execute the Python script and capture its output
+        const { stdout, stderr } = await execAsync(`python3 server/platforms/gfg_scraper.py "${username}"${sinceArg}`);
+        
+        if (stderr) {
+          console.log("Scraper debug info:", stderr);
+        }
+        
+        if (!stdout.trim()) {
+          throw new Error("No data returned from the GFG scraper");
+        }
+        
+        // Parse the JSON output from the Python script
+        const output = JSON.parse(stdout);
+        
+        // Check if the response contains an error
+        if (output.error) {
+          throw new Error(`GFG scraper error: ${output.error}`);
+        }
+        
+        return output;
+      });
     } catch (scrapingError) {
       console.warn("GFG scraper failed, falling back to consistent response for demo");
       
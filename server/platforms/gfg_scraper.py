@@ -8,8 +8,107 @@ from webdriver_manager.chrome import ChromeDriverManager
 import time
 import json
 import sys
+from array import array
+from datetime import date, timedelta
+from itertools import groupby
 
-def get_gfg_profile(username):
+from change_detection import FingerprintStore, build_response, fingerprint, parse_since
+from platform_models import GFGProfile, MONTHS
+
+# Collects every heatmap cell as a [date, count] pair inside the browser so the
+# whole calendar comes back from a single WebDriver call.
+HEATMAP_EXTRACT_JS = """
+return Array.from(document.querySelectorAll('rect.ContributionCalendar-day')).map(function (cell) {
+    return [cell.getAttribute('data-date'), parseInt(cell.getAttribute('data-count') || '0', 10) || 0];
+});
+"""
+
+def build_daily_activity(cells):
+    """
+    Packs raw [date, count] heatmap cells into a contiguous per-day array.
+    
+    Args:
+        cells: Iterable of (ISO date string, count) pairs in any order.
+        
+    Returns:
+        A dict with the first day ("start", ISO string or None) and an
+        array('H') of submission counts, one slot per day.
+    """
+    parsed = {}
+    for cell_date, count in cells:
+        try:
+            parsed[date.fromisoformat(cell_date)] = max(int(count or 0), 0)
+        except (TypeError, ValueError):
+            continue
+    
+    if not parsed:
+        return {"start": None, "counts": array('H')}
+    
+    start = min(parsed)
+    counts = array('H', bytes(2 * ((max(parsed) - start).days + 1)))
+    for day, count in parsed.items():
+        counts[(day - start).days] = min(count, 0xFFFF)
+    
+    return {"start": start.isoformat(), "counts": counts}
+
+def summarize_daily_activity(daily_activity):
+    """
+    Aggregates a per-day activity array into monthly totals, ISO-week totals
+    and submission streaks.
+    """
+    counts = daily_activity["counts"]
+    # Indexed like MONTHS
+    monthly_activity = array('I', [0] * len(MONTHS))
+    weekly_activity = {}
+    
+    if not daily_activity["start"] or not counts:
+        return {
+            "monthlyActivity": monthly_activity,
+            "weeklyActivity": weekly_activity,
+            "currentStreak": 0,
+            "maxStreak": 0
+        }
+    
+    start = date.fromisoformat(daily_activity["start"])
+    days = [start + timedelta(days=offset) for offset in range(len(counts))]
+    
+    # Months are keyed by name only, so just the last 12 calendar months of the
+    # calendar are counted; otherwise a year-long calendar adds its first,
+    # partial month to the same month a year later
+    last = days[-1]
+    first_month = (last.year * 12 + last.month - 1) - (len(MONTHS) - 1)
+    
+    # Days are contiguous, so each month / ISO week is a single run
+    for (year, month), run in groupby(zip(days, counts), key=lambda item: (item[0].year, item[0].month)):
+        if year * 12 + month - 1 >= first_month:
+            monthly_activity[month - 1] += sum(count for _, count in run)
+    
+    for (year, week), run in groupby(zip(days, counts), key=lambda item: item[0].isocalendar()[:2]):
+        weekly_activity[f"{year}-W{week:02d}"] = sum(count for _, count in run)
+    
+    # Streaks are runs of consecutive non-zero days
+    active_runs = [len(list(run)) for active, run in groupby(map(bool, counts)) if active]
+    max_streak = max(active_runs, default=0)
+    current_streak = 0
+    if counts[-1]:
+        current_streak = active_runs[-1]
+    
+    return {
+        "monthlyActivity": monthly_activity,
+        "weeklyActivity": weekly_activity,
+        "currentStreak": current_streak,
+        "maxStreak": max_streak
+    }
+
+def get_gfg_profile(username, since=None):
+    """
+    Scrapes and normalizes a user's profile.
+    
+    Args:
+        username: The GFG username.
+        since: Fingerprint of the result the caller already holds, if any; the
+               output is then shaped by change_detection.build_response.
+    """
     try:
         # Set up Selenium WebDriver
         chrome_options = Options()
@@ -51,43 +150,53 @@ def get_gfg_profile(username):
         easy_count = int(safe_find_text(driver, "div:nth-child(3) > span.score_card_value", By.CSS_SELECTOR, "0"))
         medium_hard_count = int(safe_find_text(driver, "div:nth-child(4) > span.score_card_value", By.CSS_SELECTOR, "0"))
         
-        # Extract monthly activity data if available
-        monthly_activity = {}
-        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        
-        # Try to find the heatmap data - this is approximate as GFG might use different ways to show activity
+        # Extract the activity heatmap in one round trip. Reading each cell's
+        # data-count through its own WebDriver call costs ~365 requests.
         try:
-            heatmap_elements = driver.find_elements(By.CSS_SELECTOR, "rect.ContributionCalendar-day")
-            
-            # Map the data to months (simplified approach)
-            for i, month in enumerate(months):
-                # Calculate average activity for each month (example logic)
-                month_activities = heatmap_elements[i*7:(i+1)*7] if i < len(heatmap_elements)//7 else []
-                if month_activities:
-                    activity_count = sum(int(elem.get_attribute("data-count") or "0") for elem in month_activities) // len(month_activities)
-                    monthly_activity[month] = activity_count
-                else:
-                    monthly_activity[month] = 0
-        except Exception as e:
-            # If we can't get the real data, simulate some basic activity
-            for month in months:
-                monthly_activity[month] = 0
+            heatmap_cells = driver.execute_script(HEATMAP_EXTRACT_JS) or []
+        except Exception:
+            heatmap_cells = []
         
         driver.quit()
         
+        # Fingerprint the normalized activity rather than the raw cells, which
+        # may hold null dates that can't be sorted
+        daily_activity = build_daily_activity(heatmap_cells)
+        
+        store = FingerprintStore()
+        key = f"gfg:{username.lower()}"
+        previous = store.get(key)
+        raw_hash = fingerprint([
+            total_solved, institution_rank, school_count, basic_count,
+            easy_count, medium_hard_count, daily_activity["start"], daily_activity["counts"].tolist()
+        ])
+        
+        # Same page contents as last time: skip the activity aggregation and storing
+        if previous is not None and previous["raw"] == raw_hash:
+            return build_response(previous["result"], previous["resultHash"], since)
+        
+        activity_summary = summarize_daily_activity(daily_activity)
+        
         # Prepare the result object
-        result = {
-            "username": username,
-            "totalSolved": total_solved,
-            "institutionRank": institution_rank,
-            "school": school_count,
-            "basic": basic_count,
-            "easy": easy_count,
-            "mediumHard": medium_hard_count,
-            "monthlyActivity": monthly_activity
-        }
+        profile = GFGProfile(
+            username=username,
+            total_solved=total_solved,
+            institution_rank=institution_rank,
+            school=school_count,
+            basic=basic_count,
+            easy=easy_count,
+            medium_hard=medium_hard_count,
+            monthly_activity=activity_summary["monthlyActivity"],
+            weekly_activity=activity_summary["weeklyActivity"],
+            current_streak=activity_summary["currentStreak"],
+            max_streak=activity_summary["maxStreak"],
+            daily_start=daily_activity["start"],
+            daily_counts=daily_activity["counts"]
+        )
+        result = profile.to_dict()
+        result_hash = store.put(key, raw_hash, result)
         
-        return result
+        return build_response(result, result_hash, since, previous)
         
     except Exception as e:
         if 'driver' in locals():
@@ -100,5 +209,5 @@ if __name__ == "__main__":
         sys.exit(1)
     
     username = sys.argv[1]
-    result = get_gfg_profile(username)
+    result = get_gfg_profile(username, parse_since(sys.argv[2:]))
     print(json.dumps(result))
\ No newline at end of file
@@ -0,0 +1,327 @@
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from urllib.parse import urlsplit
+
+import requests
+
+from platform_cache import cache_path
+
+LATENCY_DB = "http_latency.sqlite"
+
+# Latency histogram buckets are log-spaced: bucket i holds latencies up to
+# BUCKET_BASE_SECONDS * BUCKET_GROWTH ** i (25ms ... ~150s)
+BUCKET_BASE_SECONDS = 0.025
+BUCKET_GROWTH = 1.25
+BUCKET_COUNT = 40
+
+# Counts are halved once an endpoint reaches this many samples, so the
+# histogram follows the endpoint's recent behaviour
+MAX_SAMPLES = 500
+# Until an endpoint has this many samples, the caller's timeout applies and nothing is hedged
+MIN_SAMPLES = 20
+
+DEFAULT_TIMEOUT = 30
+# Adaptive timeout: a multiple of the p99, within fixed bounds
+TIMEOUT_MULTIPLIER = 3
+MIN_TIMEOUT = 2.0
+MAX_TIMEOUT = 60.0
+
+# A hedge is sent once a request has been outstanding for longer than the p95
+HEDGE_PERCENTILE = 0.95
+# Every request earns this many hedge tokens (up to HEDGE_BURST) and a hedge
+# spends one, so at most ~5% extra requests reach an endpoint
+HEDGE_BUDGET_RATIO = 0.05
+HEDGE_BURST = 3
+
+# Hosts whose GETs are not hedged by default: Codeforces allows one API call
+# every two seconds, so a duplicate would mostly earn a "Call limit exceeded"
+NO_HEDGE_HOSTS = {"codeforces.com"}
+
+# Set PLATFORM_HEDGING=0 to keep adaptive timeouts but never send duplicate requests
+HEDGING_ENABLED = os.environ.get("PLATFORM_HEDGING") != "0"
+
+_endpoints = {}
+_endpoints_lock = threading.Lock()
+
+def endpoint_name(url):
+    """Default statistics key for a URL: host and path, without the query string."""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+def _bucket_for(seconds):
+    bound = BUCKET_BASE_SECONDS
+    for bucket in range(BUCKET_COUNT - 1):
+        if seconds <= bound:
+            return bucket
+        bound *= BUCKET_GROWTH
+    return BUCKET_COUNT - 1
+
+def _bucket_bound(bucket):
+    return BUCKET_BASE_SECONDS * BUCKET_GROWTH ** bucket
+
+def _connect():
+    conn = sqlite3.connect(cache_path(LATENCY_DB), timeout=5)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS latency (
+            endpoint TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count REAL NOT NULL,
+            PRIMARY KEY (endpoint, bucket)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS endpoints (
+            endpoint TEXT PRIMARY KEY,
+            samples REAL NOT NULL DEFAULT 0,
+            hedge_tokens REAL NOT NULL DEFAULT 0,
+            hedges INTEGER NOT NULL DEFAULT 0,
+            requests INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    return conn
+
+class EndpointStats:
+    """
+    Latency histogram and hedge budget of one upstream endpoint.
+
+    The histogram is loaded once per process and kept in step with the shared
+    SQLite copy, which every platform script process updates. Persistence
+    errors are logged and the in-memory copy keeps working.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.counts = [0.0] * BUCKET_COUNT
+        self.lock = threading.Lock()
+        try:
+            with _connect() as conn:
+                for bucket, count in conn.execute("SELECT bucket, count FROM latency WHERE endpoint = ?", (endpoint,)):
+                    if 0 <= bucket < BUCKET_COUNT:
+                        self.counts[bucket] = count
+        except sqlite3.Error as e:
+            logging.warning(f"Could not load latency statistics for {endpoint}: {e}")
+
+    @property
+    def samples(self):
+        return sum(self.counts)
+
+    def percentile(self, q):
+        """Upper bound (seconds) of the bucket holding quantile q, or None without enough samples."""
+        with self.lock:
+            total = sum(self.counts)
+            if total < MIN_SAMPLES:
+                return None
+            seen = 0
+            for bucket, count in enumerate(self.counts):
+                seen += count
+                if seen >= q * total:
+                    return _bucket_bound(bucket)
+            return _bucket_bound(BUCKET_COUNT - 1)
+
+    def timeout(self, default):
+        """Adaptive timeout in seconds, falling back to `default` until enough samples exist."""
+        p99 = self.percentile(0.99)
+        if p99 is None:
+            return default
+        return min(max(p99 * TIMEOUT_MULTIPLIER, MIN_TIMEOUT), MAX_TIMEOUT)
+
+    def record(self, seconds):
+        """Adds a latency sample and earns the request's share of hedge tokens."""
+        bucket = _bucket_for(seconds)
+        with self.lock:
+            self.counts[bucket] += 1
+        try:
+            with _connect() as conn:
+                conn.execute(
+                    "INSERT INTO latency VALUES (?, ?, 1) "
+                    "ON CONFLICT(endpoint, bucket) DO UPDATE SET count = count + 1",
+                    (self.endpoint, bucket)
+                )
+                conn.execute(
+                    "INSERT INTO endpoints (endpoint, samples, hedge_tokens, requests) VALUES (?, 1, ?, 1) "
+                    "ON CONFLICT(endpoint) DO UPDATE SET samples = samples + 1, requests = requests + 1, "
+                    "hedge_tokens = MIN(hedge_tokens + ?, ?)",
+                    (self.endpoint, HEDGE_BUDGET_RATIO, HEDGE_BUDGET_RATIO, HEDGE_BURST)
+                )
+                samples = conn.execute("SELECT samples FROM endpoints WHERE endpoint = ?", (self.endpoint,)).fetchone()[0]
+                if samples >= MAX_SAMPLES:
+                    conn.execute("UPDATE latency SET count = count / 2 WHERE endpoint = ?", (self.endpoint,))
+                    conn.execute("UPDATE endpoints SET samples = samples / 2 WHERE endpoint = ?", (self.endpoint,))
+                    with self.lock:
+                        self.counts = [count / 2 for count in self.counts]
+        except sqlite3.Error as e:
+            logging.warning(f"Could not record latency for {self.endpoint}: {e}")
+
+    def take_hedge_token(self):
+        """Spends one hedge token. Returns False when the endpoint's budget is used up."""
+        try:
+            with _connect() as conn:
+                cursor = conn.execute(
+                    "UPDATE endpoints SET hedge_tokens = hedge_tokens - 1, hedges = hedges + 1 "
+                    "WHERE endpoint = ? AND hedge_tokens >= 1",
+                    (self.endpoint,)
+                )
+                return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logging.warning(f"Could not check hedge budget for {self.endpoint}: {e}")
+            return False
+
+def get_endpoint_stats(endpoint):
+    """Returns the per-process EndpointStats for an endpoint, loading it on first use."""
+    with _endpoints_lock:
+        if endpoint not in _endpoints:
+            _endpoints[endpoint] = EndpointStats(endpoint)
+        return _endpoints[endpoint]
+
+def _record_attempt(stats, attempt, seconds):
+    """Records an attempt's latency unless it has already been recorded."""
+    with attempt.record_lock:
+        if attempt.recorded:
+            return
+        attempt.recorded = True
+    stats.record(seconds)
+
+def _start_attempt(stats, method, url, timeout, kwargs):
+    """
+    Sends one attempt on a daemon thread, so an abandoned attempt never delays
+    the process exit. Every attempt records its own latency, including the
+    ones that lose the race; otherwise the histogram would only see the fast
+    half of each hedged pair.
+
+    Returns:
+        A Future with the attempt's start time (`started`), so request can
+        record attempts still running when it returns.
+    """
+    future = Future()
+    future.started = time.perf_counter()
+    future.recorded = False
+    future.record_lock = threading.Lock()
+
+    def run():
+        try:
+            response = requests.request(method, url, timeout=timeout, **kwargs)
+        except requests.exceptions.Timeout as e:
+            _record_attempt(stats, future, timeout)
+            future.set_exception(e)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            _record_attempt(stats, future, time.perf_counter() - future.started)
+            future.set_result(response)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+def request(method, url, endpoint=None, timeout=DEFAULT_TIMEOUT, hedge=None, **kwargs):
+    """
+    Sends an HTTP request with a timeout derived from the endpoint's latency
+    history and, for idempotent requests, a hedged duplicate once the request
+    has been outstanding longer than the endpoint's p95. The first response to
+    arrive is returned.
+
+    Args:
+        endpoint: Key the latency statistics are kept under. Defaults to the
+                  URL's host and path; pass one explicitly when different
+                  calls share a URL (e.g. GraphQL queries).
+        timeout: Timeout in seconds until the endpoint has enough samples.
+        hedge: Whether a duplicate may be sent. Defaults to True for GETs to
+               hosts outside NO_HEDGE_HOSTS; pass True for read-only POSTs.
+
+    Only a 2xx response wins the race. When no attempt gets one, the last
+    response received is returned (or the last error raised), as
+    requests.request would.
+
+    Raises:
+        requests.exceptions.RequestException, like requests.request.
+    """
+    stats = get_endpoint_stats(endpoint or endpoint_name(url))
+    attempt_timeout = stats.timeout(timeout)
+    if hedge is None:
+        hedge = method.upper() == "GET" and urlsplit(url).hostname not in NO_HEDGE_HOSTS
+    hedge_after = stats.percentile(HEDGE_PERCENTILE) if hedge and HEDGING_ENABLED else None
+
+    if hedge_after is None:
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, url, timeout=attempt_timeout, **kwargs)
+        except requests.exceptions.Timeout:
+            # Timeouts count as (censored) samples so a slowed-down endpoint gets longer timeouts
+            stats.record(attempt_timeout)
+            raise
+        stats.record(time.perf_counter() - start)
+        return response
+
+    attempts = [_start_attempt(stats, method, url, attempt_timeout, kwargs)]
+    done, pending = wait(attempts, timeout=hedge_after)
+    if not done and stats.take_hedge_token():
+        logging.info(f"Hedging request to {stats.endpoint} after {hedge_after:.2f}s")
+        attempts.append(_start_attempt(stats, method, url, attempt_timeout, kwargs))
+        pending.add(attempts[-1])
+
+    try:
+        # Return the first 2xx response; an error status or exception only
+        # surfaces once every attempt failed
+        error = None
+        fallback = None
+        while done or pending:
+            if not done:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            try:
+                response = done.pop().result()
+            except requests.exceptions.RequestException as e:
+                error = e
+                continue
+            if 200 <= response.status_code < 300:
+                return response
+            fallback = response
+        if fallback is not None:
+            return fallback
+        raise error
+    finally:
+        # The losing attempt's thread dies with the process, often before it
+        # records anything; record it now as a censored sample at its elapsed
+        # time, so the slow tail still reaches the histogram
+        for attempt in attempts:
+            if not attempt.done():
+                _record_attempt(stats, attempt, time.perf_counter() - attempt.started)
+
+def get(url, **kwargs):
+    """requests.get with adaptive timeouts and hedging (see request)."""
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    """requests.post with adaptive timeouts (see request); only hedged with hedge=True."""
+    return request("POST", url, **kwargs)
+
+def latency_report():
+    """Per-endpoint sample counts, p50/p95/p99, current timeout and hedge usage."""
+    with _connect() as conn:
+        rows = conn.execute("SELECT endpoint, requests, hedges, hedge_tokens FROM endpoints ORDER BY endpoint").fetchall()
+
+    report = {}
+    for endpoint, request_count, hedges, tokens in rows:
+        stats = EndpointStats(endpoint)
+        report[endpoint] = {
+            "samples": round(stats.samples, 1),
+            "p50": stats.percentile(0.5),
+            "p95": stats.percentile(HEDGE_PERCENTILE),
+            "p99": stats.percentile(0.99),
+            "timeout": stats.timeout(None),
+            "requests": request_count,
+            "hedges": hedges,
+            "hedgeTokens": round(tokens, 2)
+        }
+    return report
+
+if __name__ == "__main__":
+    try:
+        print(json.dumps(latency_report()))
+    except sqlite3.Error as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
@@ -0,0 +1,326 @@
+import json
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+from platform_cache import cache_path
+
+JOB_QUEUE_DB = os.environ.get("JOB_QUEUE_DB") or cache_path("jobs.sqlite")
+
+JOB_KINDS = ("leetcode", "codeforces", "gfg", "contests")
+
+DEFAULT_VISIBILITY_TIMEOUT = 120
+DEFAULT_MAX_ATTEMPTS = 3
+# Retry delay doubles per attempt: 5s, 10s, 20s, ... capped at RETRY_MAX_DELAY
+RETRY_BASE_DELAY = 5
+RETRY_MAX_DELAY = 300
+# Finished jobs (with their results) are pruned after this long; dead jobs are
+# kept longer so they can still be inspected and requeued
+DONE_JOB_TTL = 24 * 60 * 60
+DEAD_JOB_TTL = 7 * 24 * 60 * 60
+
+class JobQueue:
+    """
+    Durable job queue backed by a SQLite file.
+
+    Any number of worker processes can share the file: leases are taken inside
+    an IMMEDIATE transaction, so a job is handed to one worker at a time. A
+    leased job that is not completed before its visibility timeout (e.g. the
+    worker crashed) becomes available again. Jobs that fail `max_attempts`
+    times move to the dead-letter state instead of being retried.
+
+    Job states: queued -> leased -> done | queued (retry) | dead
+    """
+
+    def __init__(self, path=JOB_QUEUE_DB):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    dedupe_key TEXT,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    available_at REAL NOT NULL,
+                    lease_token TEXT,
+                    lease_expires_at REAL,
+                    worker_id TEXT,
+                    result TEXT,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, kind, available_at)")
+            # At most one pending job per dedupe key (e.g. "leetcode:alice")
+            conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS jobs_pending_dedupe ON jobs (dedupe_key)
+                WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'leased')
+            """)
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit mode; lease() manages its own transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, kind, payload, dedupe_key=None, max_attempts=DEFAULT_MAX_ATTEMPTS, delay=0):
+        """
+        Adds a job to the queue.
+
+        If `dedupe_key` matches a job that is still queued or leased, no new job
+        is created and the existing job's id is returned.
+
+        Returns:
+            The job id.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        now = time.time()
+        with self._connect() as conn:
+            while True:
+                try:
+                    cursor = conn.execute(
+                        "INSERT INTO jobs (kind, payload, dedupe_key, max_attempts, available_at, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (kind, json.dumps(payload), dedupe_key, max_attempts, now + delay, now, now)
+                    )
+                    return cursor.lastrowid
+                except sqlite3.IntegrityError:
+                    row = conn.execute(
+                        "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'leased')",
+                        (dedupe_key,)
+                    ).fetchone()
+                    if row is not None:
+                        return row["id"]
+                    # The conflicting job finished in between; try the insert again
+
+    def lease(self, worker_id, kinds=JOB_KINDS, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        """
+        Claims the oldest ready job of the given kinds.
+
+        Returns:
+            A dict with id, kind, payload, attempts and lease_token, or None if nothing is ready.
+        """
+        now = time.time()
+        placeholders = ",".join("?" * len(kinds))
+        with self._connect() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    f"""
+                    SELECT * FROM jobs
+                    WHERE kind IN ({placeholders})
+                      AND ((status = 'queued' AND available_at <= ?)
+                           OR (status = 'leased' AND lease_expires_at <= ?))
+                    ORDER BY available_at, id
+                    LIMIT 1
+                    """,
+                    (*kinds, now, now)
+                ).fetchone()
+
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                # A worker whose lease expired on the last attempt never reported back
+                if row["status"] == "leased" and row["attempts"] >= row["max_attempts"]:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'dead', lease_token = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                        ("Lease expired on final attempt", now, row["id"])
+                    )
+                    conn.execute("COMMIT")
+                    return self.lease(worker_id, kinds, visibility_timeout)
+
+                token = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_token = ?, "
+                    "lease_expires_at = ?, worker_id = ?, updated_at = ? WHERE id = ?",
+                    (token, now + visibility_timeout, worker_id, now, row["id"])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "payload": json.loads(row["payload"]),
+            "attempts": row["attempts"] + 1,
+            "lease_token": token
+        }
+
+    def extend(self, job_id, lease_token, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        """Pushes back a lease's expiry for long-running jobs. Returns False if the lease was lost."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? "
+                "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (time.time() + visibility_timeout, time.time(), job_id, lease_token)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, lease_token, result):
+        """Stores a job's result. Returns False if the lease was lost (the result is discarded)."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_token = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (json.dumps(result), time.time(), job_id, lease_token)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id, lease_token, error):
+        """
+        Records a failed attempt: the job is retried with exponential backoff,
+        or dead-lettered once it has used all its attempts.
+
+        Returns:
+            The job's new status ("queued" or "dead"), or None if the lease was lost.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (job_id, lease_token)
+            ).fetchone()
+            if row is None:
+                return None
+
+            if row["attempts"] >= row["max_attempts"]:
+                status, available_at = "dead", now
+            else:
+                status = "queued"
+                available_at = now + min(RETRY_BASE_DELAY * 2 ** (row["attempts"] - 1), RETRY_MAX_DELAY)
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, last_error = ?, lease_token = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_token = ?",
+                (status, available_at, str(error), now, job_id, lease_token)
+            )
+            return status
+
+    def get(self, job_id):
+        """Returns a job's public state (status, attempts, result, last error), or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "payload": json.loads(row["payload"]),
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "lastError": row["last_error"],
+            "updatedAt": row["updated_at"]
+        }
+
+    def requeue_dead(self, kind=None):
+        """
+        Moves dead-lettered jobs back to the queue with a fresh set of attempts.
+
+        A dead job whose dedupe key already has a queued or leased job (or a
+        newer dead job requeued in the same call) stays dead, since requeuing
+        it would duplicate that work.
+
+        Returns:
+            {"requeued": count, "skipped": count}
+        """
+        now = time.time()
+        requeued = skipped = 0
+        with self._connect() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                pending_keys = {
+                    row["dedupe_key"] for row in conn.execute(
+                        "SELECT dedupe_key FROM jobs WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'leased')"
+                    )
+                }
+                dead = conn.execute(
+                    "SELECT id, dedupe_key FROM jobs WHERE status = 'dead' AND (? IS NULL OR kind = ?) ORDER BY id DESC",
+                    (kind, kind)
+                ).fetchall()
+
+                for row in dead:
+                    if row["dedupe_key"] is not None and row["dedupe_key"] in pending_keys:
+                        skipped += 1
+                        continue
+                    conn.execute(
+                        "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, last_error = NULL, "
+                        "updated_at = ? WHERE id = ?",
+                        (now, now, row["id"])
+                    )
+                    if row["dedupe_key"] is not None:
+                        pending_keys.add(row["dedupe_key"])
+                    requeued += 1
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return {"requeued": requeued, "skipped": skipped}
+
+    def prune(self, done_ttl=DONE_JOB_TTL, dead_ttl=DEAD_JOB_TTL):
+        """
+        Deletes done jobs older than `done_ttl` and dead jobs older than
+        `dead_ttl` seconds (by their last update).
+
+        Returns:
+            The number of jobs deleted.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE (status = 'done' AND updated_at < ?) OR (status = 'dead' AND updated_at < ?)",
+                (now - done_ttl, now - dead_ttl)
+            )
+            return cursor.rowcount
+
+    def stats(self):
+        """Counts jobs per kind and status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status").fetchall()
+        stats = {}
+        for row in rows:
+            stats.setdefault(row["kind"], {})[row["status"]] = row["n"]
+        return stats
+
+if __name__ == "__main__":
+    queue = JobQueue()
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+
+    try:
+        if command == "enqueue" and len(sys.argv) >= 3:
+            kind = sys.argv[2]
+            payload = json.loads(sys.argv[3]) if len(sys.argv) > 3 else {}
+            dedupe_key = f"{kind}:{payload['username']}" if "username" in payload else kind
+            print(json.dumps({"id": queue.enqueue(kind, payload, dedupe_key=dedupe_key)}))
+        elif command == "status" and len(sys.argv) >= 3:
+            job = queue.get(int(sys.argv[2]))
+            print(json.dumps(job if job else {"error": "Job not found"}))
+        elif command == "requeue-dead":
+            print(json.dumps(queue.requeue_dead(sys.argv[2] if len(sys.argv) > 2 else None)))
+        elif command == "prune":
+            print(json.dumps({"pruned": queue.prune()}))
+        elif command == "stats":
+            print(json.dumps(queue.stats()))
+        else:
+            print(json.dumps({"error": "Usage: job_queue.py enqueue <kind> [payload-json] | status <id> | requeue-dead [kind] | prune | stats"}))
+            sys.exit(1)
+    except (ValueError, sqlite3.Error) as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+from job_queue import DEFAULT_VISIBILITY_TIMEOUT, JOB_KINDS, JobQueue
+from parse_pool import enable_parse_pool
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Selenium scrapes can take a while; give them a longer lease
+VISIBILITY_TIMEOUTS = {"gfg": 300, "contests": 300}
+IDLE_SLEEP_SECONDS = 2
+# Leases are extended this many times per visibility timeout while a job runs
+HEARTBEATS_PER_TIMEOUT = 3
+# How often a worker prunes old finished jobs from the queue
+PRUNE_INTERVAL_SECONDS = 60 * 60
+
+def run_leetcode_job(payload):
+    from leetcode_api import get_leetcode_profile
+    return get_leetcode_profile(payload["username"])
+
+def run_codeforces_job(payload):
+    from codeforces_api import get_codeforces_profile
+    return get_codeforces_profile(payload["username"])
+
+def run_gfg_job(payload):
+    from gfg_scraper import get_gfg_profile
+    return get_gfg_profile(payload["username"])
+
+def run_contests_job(payload):
+    from contest_store import refresh_store
+    store = refresh_store()
+    return {"count": len(store.contests)}
+
+# Handlers are imported lazily so a worker only needs the dependencies of the
+# kinds it serves (e.g. Selenium only for gfg)
+JOB_HANDLERS = {
+    "leetcode": run_leetcode_job,
+    "codeforces": run_codeforces_job,
+    "gfg": run_gfg_job,
+    "contests": run_contests_job,
+}
+
+def _heartbeat(queue, job, visibility_timeout, stopped):
+    # Keeps extending the lease until the job finishes, so a slow job (e.g. a
+    # GFG scrape waiting on a ChromeDriver install) isn't leased out again
+    while not stopped.wait(visibility_timeout / HEARTBEATS_PER_TIMEOUT):
+        try:
+            if not queue.extend(job["id"], job["lease_token"], visibility_timeout):
+                return
+        except sqlite3.Error as e:
+            logging.warning(f"Could not extend the lease on job {job['id']}: {e}")
+
+def process_one(queue, worker_id, kinds):
+    """
+    Leases and runs a single job, extending its lease while it runs.
+
+    Fetchers report failures as {"error": ...} instead of raising, so those
+    results are treated as failed attempts and retried.
+
+    Returns:
+        False if no job was ready, True otherwise.
+    """
+    visibility_timeout = max(VISIBILITY_TIMEOUTS.get(kind, DEFAULT_VISIBILITY_TIMEOUT) for kind in kinds)
+    job = queue.lease(worker_id, kinds, visibility_timeout)
+    if job is None:
+        return False
+
+    logging.info(f"Running {job['kind']} job {job['id']} (attempt {job['attempts']})")
+    stopped = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(queue, job, visibility_timeout, stopped), daemon=True)
+    heartbeat.start()
+    try:
+        result = JOB_HANDLERS[job["kind"]](job["payload"])
+    except Exception as e:
+        logging.error(f"Job {job['id']} raised: {e}", exc_info=True)
+        status = queue.fail(job["id"], job["lease_token"], e)
+    else:
+        if isinstance(result, dict) and result.get("error"):
+            status = queue.fail(job["id"], job["lease_token"], result["error"])
+        elif result is None:
+            status = queue.fail(job["id"], job["lease_token"], "No data returned")
+        else:
+            status = "done" if queue.complete(job["id"], job["lease_token"], result) else None
+    finally:
+        stopped.set()
+        heartbeat.join()
+
+    if status is None:
+        logging.warning(f"Lost the lease on job {job['id']}; another worker has taken it over")
+    else:
+        logging.info(f"Job {job['id']} -> {status}")
+    return True
+
+def run_worker(kinds=JOB_KINDS, once=False):
+    """Processes jobs until interrupted (or until the queue is empty, with `once`)."""
+    queue = JobQueue()
+    # The worker runs many jobs, so starting parse workers pays off here
+    enable_parse_pool()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+
+    logging.info(f"Worker {worker_id} serving {', '.join(kinds)}")
+    next_prune = 0
+    while not stopping:
+        if time.time() >= next_prune:
+            try:
+                pruned = queue.prune()
+                if pruned:
+                    logging.info(f"Pruned {pruned} finished jobs")
+            except sqlite3.Error as e:
+                logging.warning(f"Could not prune finished jobs: {e}")
+            next_prune = time.time() + PRUNE_INTERVAL_SECONDS
+        if not process_one(queue, worker_id, kinds):
+            if once:
+                break
+            time.sleep(IDLE_SLEEP_SECONDS)
+
+if __name__ == "__main__":
+    kinds = JOB_KINDS
+    for arg in sys.argv[1:]:
+        if arg.startswith("--kinds="):
+            kinds = tuple(k for k in arg.split("=", 1)[1].split(",") if k in JOB_KINDS)
+
+    if not kinds:
+        print(json.dumps({"error": f"No valid job kinds; expected some of {', '.join(JOB_KINDS)}"}))
+        sys.exit(1)
+
+    try:
+        run_worker(kinds, once="--once" in sys.argv[1:])
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,54 @@
+import { exec } from "child_process";
+import { promisify } from "util";
+
+const execAsync = promisify(exec);
+
+export type JobKind = "leetcode" | "codeforces" | "gfg" | "contests";
+
+export const JOB_KINDS: JobKind[] = ["leetcode", "codeforces", "gfg", "contests"];
+
+export interface JobState {
+  id: number;
+  kind: JobKind;
+  payload: Record<string, any>;
+  status: "queued" | "leased" | "done" | "dead";
+  attempts: number;
+  result: any;
+  lastError: string | null;
+  updatedAt: number;
+}
+
+async function runJobQueue(args: string): Promise<any> {
+  const { stdout, stderr } = await execAsync(`python3 server/platforms/job_queue.py ${args}`);
+  
+  if (stderr) {
+    console.log("Job queue debug info:", stderr);
+  }
+  
+  const result = JSON.parse(stdout);
+  if (result.error) {
+    throw new Error(`Job queue error: ${result.error}`);
+  }
+  return result;
+}
+
+/**
+ * Queues a platform refresh for the job_worker.py processes to pick up.
+ * A refresh that is already pending for the same user is reused.
+ *
+ * @param kind The fetcher to run
+ * @param username The platform username (not needed for "contests")
+ * @returns The job id
+ */
+export async function enqueueRefreshJob(kind: JobKind, username?: string): Promise<number> {
+  const payload = username ? JSON.stringify({ username }) : "{}";
+  const { id } = await runJobQueue(`enqueue ${kind} '${payload.replace(/'/g, "'\\''")}'`);
+  return id;
+}
+
+/**
+ * Returns a job's status and, once done, its result
+ */
+export async function getJob(jobId: number): Promise<JobState> {
+  return await runJobQueue(`status ${jobId}`);
+}
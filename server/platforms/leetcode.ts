@@ -1,9 +1,13 @@
-import { LeetcodeUserData } from "@shared/schema";
+import { LeetcodeUserData, LeetcodeRecentSubmissions } from "@shared/schema";
 import { exec } from "child_process";
 import { promisify } from "util";
+import { ProfileCache } from "./fingerprint";
 
 const execAsync = promisify(exec);
 
+// Last profile per user; the script then only reports what changed
+const leetcodeProfiles = new ProfileCache<LeetcodeUserData>();
+
 /**
  * Runs the Python-based LeetCode scraper and returns the results or throws an error
  * 
@@ -16,34 +20,30 @@ export async function runLeetCodeScraper(username: string): Promise<{
 }> {
   console.log(`Running LeetCode scraper for user: ${username}`);
   
-  // Execute the Python script and capture its output
-  const { stdout, stderr } = await execAsync(`python3 server/platforms/leetcode_api.py "${username}"`);
-  
-  let debugInfo = undefined;
-  if (stderr) {
-    console.log("API debug info:", stderr);
-    debugInfo = stderr;
-  }
-  
-  if (!stdout.trim()) {
-    throw new Error("No data returned from the LeetCode API");
-  }
-  
-  // Check if the response contains an error
-  try {
+  let debugInfo: string | undefined;
+  const userData = await leetcodeProfiles.fetch(username, async (sinceArg) => {
+    // Execute the Python script and capture its output
+    const { stdout, stderr } = await execAsync(`python3 server/platforms/leetcode_api.py "${username}"${sinceArg}`);
+    
+    if (stderr) {
+      console.log("API debug info:", stderr);
+      debugInfo = stderr;
+    }
+    
+    if (!stdout.trim()) {
+      throw new Error("No data returned from the LeetCode API");
+    }
+    
+    // Parse the JSON output from the Python script
     const parsedOutput = JSON.parse(stdout);
+    
+    // Check if the response contains an error
     if (parsedOutput.error) {
       throw new Error(`LeetCode API error: ${parsedOutput.error}`);
     }
-  } catch (e) {
-    // If it's not a JSON parse error, rethrow
-    if (!(e instanceof SyntaxError)) {
-      throw e;
-    }
-  }
-  
-  // Parse the JSON output from the Python script
-  const userData = JSON.parse(stdout) as LeetcodeUserData;
+    
+    return parsedOutput;
+  });
   
   // Validate the data structure to ensure it matches the expected format
   if (!userData.username || 
@@ -57,6 +57,50 @@ export async function runLeetCodeScraper(username: string): Promise<{
   return { data: userData, debug: debugInfo };
 }
 
+/**
+ * Fetches accepted submissions made since the last call for this user.
+ * The Python side keeps a per-user cursor; once the submissions are processed,
+ * commitLeetcodeCursor advances it so later calls only return new solves.
+ * 
+ * @param username The LeetCode username
+ * @returns New accepted submissions matched against the problem catalog
+ */
+export async function fetchLeetcodeRecentAccepted(username: string): Promise<LeetcodeRecentSubmissions> {
+  const { stdout, stderr } = await execAsync(`python3 server/platforms/leetcode_api.py "${username}" --recent`);
+  
+  if (stderr) {
+    console.log("API debug info:", stderr);
+  }
+  
+  if (!stdout.trim()) {
+    throw new Error("No data returned from the LeetCode API");
+  }
+  
+  const result = JSON.parse(stdout);
+  if (result.error) {
+    throw new Error(`LeetCode API error: ${result.error}`);
+  }
+  
+  return result as LeetcodeRecentSubmissions;
+}
+
+/**
+ * Advances the recent-submissions cursor once the returned submissions have been processed.
+ * 
+ * @param username The LeetCode username
+ * @param cursor The cursor returned by fetchLeetcodeRecentAccepted
+ */
+export async function commitLeetcodeCursor(username: string, cursor: number): Promise<void> {
+  const { stdout } = await execAsync(
+    `python3 server/platforms/leetcode_api.py "${username}" --commit-cursor=${Math.floor(cursor)}`
+  );
+  
+  const result = JSON.parse(stdout);
+  if (result.error) {
+    throw new Error(`LeetCode cursor error: ${result.error}`);
+  }
+}
+
 /**
  * Fetches LeetCode profile data for a given username using a Selenium-based Python scraper.
  * Falls back to static data if scraping fails.
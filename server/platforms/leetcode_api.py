@@ -1,14 +1,45 @@
 import requests
 import json
 import sys
+import os
+import csv
+import sqlite3
 
-def get_leetcode_profile(username):
+import http_client
+from change_detection import FingerprintStore, build_response, fingerprint, parse_since
+from platform_cache import cache_path, load_json
+from platform_models import LeetcodeProfile, TagCounts
+from recommendations import get_solved, update_user_state
+
+LEETCODE_GRAPHQL_URL = "https://leetcode.com/graphql"
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "attached_assets", "leetcode_problems_full.csv")
+CURSOR_DB = "leetcode_cursors.sqlite"
+LEGACY_CURSOR_FILE = "leetcode_cursors.json"
+
+# Both queries go to the same URL, so their latencies are tracked separately
+PROFILE_ENDPOINT = "leetcode.com/graphql:getUserProfile"
+RECENT_ENDPOINT = "leetcode.com/graphql:recentAcSubmissions"
+
+# LeetCode caps recentAcSubmissionList at 20 entries per call
+RECENT_SUBMISSION_LIMIT = 20
+
+_catalog_by_slug = None
+
+def get_leetcode_profile(username, since=None):
+    """
+    Fetches and normalizes a user's profile.
+    
+    Args:
+        username: The LeetCode username.
+        since: Fingerprint of the result the caller already holds, if any; the
+               output is then shaped by change_detection.build_response.
+    """
     # GraphQL endpoint for LeetCode
-    url = "https://leetcode.com/graphql"
+    url = LEETCODE_GRAPHQL_URL
     
     # GraphQL query to fetch detailed user profile data
     query = """
-    query getUserProfile($username: String!) {
+    query getUserProfile($username: String!, $recentLimit: Int!) {
         matchedUser(username: $username) {
             username
             submitStatsGlobal {
@@ -45,30 +76,82 @@ def get_leetcode_profile(username):
                 totalActiveDays
             }
         }
+        recentAcSubmissionList(username: $username, limit: $recentLimit) {
+            titleSlug
+        }
     }
     """
     # Variables for the GraphQL query
-    variables = {"username": username}
+    variables = {"username": username, "recentLimit": RECENT_SUBMISSION_LIMIT}
     
-    # Send POST request to the GraphQL endpoint
-    response = requests.post(url, json={"query": query, "variables": variables})
+    # Send POST request to the GraphQL endpoint (a read-only query, so it may be hedged)
+    try:
+        response = http_client.post(url, endpoint=PROFILE_ENDPOINT, hedge=True,
+                                    json={"query": query, "variables": variables})
+    except requests.exceptions.RequestException as e:
+        return {"error": str(e)}
     
     # Check if the request was successful
     if response.status_code == 200:
+        store = FingerprintStore()
+        key = f"leetcode:{username.lower()}"
+        previous = store.get(key)
+        raw_hash = fingerprint(response.content)
+        
+        # Same payload as last time: skip decoding, normalizing and storing
+        if previous is not None and previous["raw"] == raw_hash:
+            return build_response(previous["result"], previous["resultHash"], since)
+        
         data = response.json()
         if not data.get('data', {}).get('matchedUser'):
             return {"error": "User not found"}
         
         # Process the data
         result = process_leetcode_data(data)
-        return result
+        seed_recommendation_state(username, result, data["data"].get("recentAcSubmissionList") or [])
+        result_hash = store.put(key, raw_hash, result)
+        return build_response(result, result_hash, since, previous)
     else:
         return {"error": f"API Error: {response.status_code}", "details": response.text}
 
+def seed_recommendation_state(username, result, recent):
+    """
+    Feeds a profile into the recommender: the catalog has no tags, so the
+    per-difficulty solve counts stand in for tag counts; the recent accepted
+    submissions (the only solved slugs LeetCode exposes publicly) are merged
+    into the solved set.
+    """
+    try:
+        update_user_state(
+            "leetcode", username,
+            new_solves=[submission["titleSlug"] for submission in recent if submission.get("titleSlug")],
+            rating=result["contestRating"] or None,
+            tag_counts={
+                "Easy": result["easySolved"],
+                "Medium": result["mediumSolved"],
+                "Hard": result["hardSolved"]
+            }
+        )
+    except sqlite3.Error as e:
+        print(f"Could not update recommendation state: {e}", file=sys.stderr)
+
 def process_leetcode_data(profile_data):
-    if not profile_data or not profile_data.get("data") or not profile_data["data"].get("matchedUser"):
+    profile = build_leetcode_profile(profile_data)
+    if profile is None:
         return {"error": "No data found"}
     
+    return profile.to_dict()
+
+def build_leetcode_profile(profile_data):
+    """
+    Converts a raw getUserProfile GraphQL response into a LeetcodeProfile.
+    
+    Returns:
+        A LeetcodeProfile, or None if the response holds no user.
+    """
+    if not profile_data or not profile_data.get("data") or not profile_data["data"].get("matchedUser"):
+        return None
+    
     matched_user = profile_data["data"]["matchedUser"]
     
     # Extract username
@@ -95,40 +178,189 @@ def process_leetcode_data(profile_data):
         elif stat["difficulty"] == "Hard":
             hard_solved = stat["count"]
     
-    # Extract topics/tags data
-    topic_data = {}
+    # Extract topics/tags data (advanced, intermediate and fundamental tags)
+    topics = TagCounts()
+    tag_problem_counts = matched_user.get("tagProblemCounts") or {}
+    for level in ("advanced", "intermediate", "fundamental"):
+        for tag in tag_problem_counts.get(level) or []:
+            if tag["problemsSolved"] > 0:
+                topics[tag["tagName"]] = tag["problemsSolved"]
     
-    # Process advanced tags
-    for tag in matched_user.get("tagProblemCounts", {}).get("advanced", []):
-        if tag["problemsSolved"] > 0:
-            topic_data[tag["tagName"]] = tag["problemsSolved"]
+    # Determine a contest rating (use star rating or default to a value based on solved problems)
+    contest_rating = (profile.get("starRating") or 0) * 400 or (1500 + total_solved // 10)
     
-    # Process intermediate tags
-    for tag in matched_user.get("tagProblemCounts", {}).get("intermediate", []):
-        if tag["problemsSolved"] > 0:
-            topic_data[tag["tagName"]] = tag["problemsSolved"]
+    return LeetcodeProfile(
+        username=username,
+        total_solved=total_solved,
+        easy_solved=easy_solved,
+        medium_solved=medium_solved,
+        hard_solved=hard_solved,
+        ranking=ranking,
+        contest_rating=contest_rating,
+        topics=topics
+    )
+
+def load_problem_catalog():
+    """
+    Loads leetcode_problems_full.csv once and indexes it by problem slug.
     
-    # Process fundamental tags
-    for tag in matched_user.get("tagProblemCounts", {}).get("fundamental", []):
-        if tag["problemsSolved"] > 0:
-            topic_data[tag["tagName"]] = tag["problemsSolved"]
+    Returns:
+        A dict mapping title slug to the catalog entry.
+    """
+    global _catalog_by_slug
+    if _catalog_by_slug is not None:
+        return _catalog_by_slug
     
-    # Determine a contest rating (use star rating or default to a value based on solved problems)
-    contest_rating = profile.get("starRating", 0) * 400 or (1500 + total_solved // 10)
+    catalog = {}
+    try:
+        with open(CATALOG_PATH, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                # Links look like https://leetcode.com/problems/two-sum/description/
+                parts = row["Link"].split("/problems/", 1)
+                if len(parts) != 2:
+                    continue
+                slug = parts[1].split("/", 1)[0]
+                catalog[slug] = {
+                    "questionNumber": row["Question Number"],
+                    "title": row["Title"],
+                    "link": row["Link"],
+                    "difficulty": row["Difficulty"],
+                    "premium": row.get("Premium") == "True"
+                }
+    except OSError as e:
+        print(f"Could not load LeetCode catalog: {e}", file=sys.stderr)
     
-    # Create the result structure
-    result = {
+    _catalog_by_slug = catalog
+    return catalog
+
+def get_recent_accepted_submissions(username, since=None):
+    """
+    Fetches recent accepted submissions that are newer than a cursor.
+    
+    The cursor is not advanced here: callers pass the returned cursor to
+    commit_cursor once they have processed the submissions, so a failure in
+    between returns the same submissions on the next call.
+    
+    Args:
+        username: The LeetCode username.
+        since: Unix timestamp of the newest submission already processed.
+               Defaults to the cursor persisted for this user.
+        
+    Returns:
+        A dictionary with the new submissions (oldest first, matched against
+        the problem catalog), the cursor to commit, and every slug known to
+        be solved by the user (so questions added after an earlier sync can
+        still be matched).
+    """
+    if since is None:
+        since = get_cursor(username)
+    
+    query = """
+    query recentAcSubmissions($username: String!, $limit: Int!) {
+        recentAcSubmissionList(username: $username, limit: $limit) {
+            id
+            title
+            titleSlug
+            timestamp
+        }
+    }
+    """
+    variables = {"username": username, "limit": RECENT_SUBMISSION_LIMIT}
+    
+    try:
+        response = http_client.post(LEETCODE_GRAPHQL_URL, endpoint=RECENT_ENDPOINT, hedge=True,
+                                    json={"query": query, "variables": variables})
+    except requests.exceptions.RequestException as e:
+        return {"error": str(e)}
+    
+    if response.status_code != 200:
+        return {"error": f"API Error: {response.status_code}", "details": response.text}
+    
+    data = response.json()
+    recent = (data.get("data") or {}).get("recentAcSubmissionList")
+    if recent is None:
+        return {"error": "User not found"}
+    
+    catalog = load_problem_catalog()
+    new_submissions = []
+    seen_slugs = set()
+    cursor = since
+    
+    # The list is newest first, so stop as soon as we reach the cursor
+    for submission in recent:
+        timestamp = int(submission.get("timestamp") or 0)
+        if timestamp <= since:
+            break
+        cursor = max(cursor, timestamp)
+        
+        slug = submission.get("titleSlug")
+        if not slug or slug in seen_slugs:
+            continue
+        seen_slugs.add(slug)
+        
+        entry = catalog.get(slug, {})
+        new_submissions.append({
+            "id": submission.get("id"),
+            "titleSlug": slug,
+            "title": submission.get("title") or entry.get("title"),
+            "timestamp": timestamp,
+            "questionNumber": entry.get("questionNumber"),
+            "difficulty": entry.get("difficulty"),
+            "link": entry.get("link") or f"https://leetcode.com/problems/{slug}/"
+        })
+    
+    solved_slugs = set(seen_slugs)
+    try:
+        if new_submissions:
+            update_user_state("leetcode", username, new_solves=seen_slugs)
+        solved_slugs |= get_solved("leetcode", username)
+    except sqlite3.Error as e:
+        print(f"Could not update recommendation state: {e}", file=sys.stderr)
+    
+    new_submissions.reverse()
+    return {
         "username": username,
-        "totalSolved": total_solved,
-        "easySolved": easy_solved,
-        "mediumSolved": medium_solved,
-        "hardSolved": hard_solved,
-        "ranking": ranking,
-        "contestRating": contest_rating,
-        "topicData": topic_data
+        "cursor": cursor,
+        "newSubmissions": new_submissions,
+        "solvedSlugs": sorted(solved_slugs)
     }
+
+def _connect_cursors():
+    conn = sqlite3.connect(cache_path(CURSOR_DB), timeout=5)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cursors (
+            username TEXT PRIMARY KEY,
+            cursor INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    return conn
+
+def get_cursor(username):
+    """Returns a user's recent-submissions cursor (0 if none was committed)."""
+    with _connect_cursors() as conn:
+        row = conn.execute("SELECT cursor FROM cursors WHERE username = ?", (username,)).fetchone()
+    if row:
+        return row[0]
+    # Cursors committed before they moved to SQLite
+    return load_json(LEGACY_CURSOR_FILE, {}).get(username, 0)
+
+def commit_cursor(username, cursor):
+    """
+    Persists a user's recent-submissions cursor once the submissions up to it
+    have been processed. The cursor never moves backwards; the update is a
+    single statement, so concurrent syncs can't drop each other's cursors.
     
-    return result
+    Returns:
+        The stored cursor.
+    """
+    cursor = max(cursor, get_cursor(username))
+    with _connect_cursors() as conn:
+        conn.execute(
+            "INSERT INTO cursors VALUES (?, ?) "
+            "ON CONFLICT(username) DO UPDATE SET cursor = MAX(cursor, excluded.cursor)",
+            (username, cursor)
+        )
+        return conn.execute("SELECT cursor FROM cursors WHERE username = ?", (username,)).fetchone()[0]
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -136,5 +368,14 @@ if __name__ == "__main__":
         sys.exit(1)
     
     username = sys.argv[1]
-    result = get_leetcode_profile(username)
+    commit = next((arg.split("=", 1)[1] for arg in sys.argv[2:] if arg.startswith("--commit-cursor=")), None)
+    if commit is not None:
+        try:
+            result = {"username": username, "cursor": commit_cursor(username, int(commit))}
+        except ValueError:
+            result = {"error": "Cursor must be a Unix timestamp"}
+    elif "--recent" in sys.argv[2:]:
+        result = get_recent_accepted_submissions(username)
+    else:
+        result = get_leetcode_profile(username, parse_since(sys.argv[2:]))
     print(json.dumps(result))
\ No newline at end of file
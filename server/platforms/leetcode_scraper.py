@@ -9,6 +9,8 @@ import json
 import sys
 import os
 
+from platform_models import LeetcodeProfile, TagCounts
+
 def get_leetcode_profile(username):
     """
     Fetches user profile details from LeetCode using Selenium.
@@ -193,25 +195,26 @@ def get_leetcode_profile(username):
         contest_rating = int(profile_data.get('contest_rating', '0')) if profile_data.get('contest_rating', '0').isdigit() else 0
         
         # Convert skills to topic data format
-        topic_data = {}
+        topics = TagCounts()
         for skill in profile_data.get('skills_languages', []):
             skill_name = skill.get('skill_name')
             solved_count = skill.get('solved_count', '0')
             if skill_name:
-                topic_data[skill_name] = int(solved_count) if solved_count.isdigit() else 0
+                topics[skill_name] = int(solved_count) if solved_count.isdigit() else 0
         
-        # Create the final result in the expected format
-        result = {
-            "username": username,
-            "totalSolved": total_solved if isinstance(total_solved, int) else 0,
-            "easySolved": easy_solved,
-            "mediumSolved": medium_solved,
-            "hardSolved": hard_solved,
-            "ranking": ranking,
-            "contestRating": contest_rating,
-            "topicData": topic_data,
-            "detailedData": profile_data  # Include the full detailed data as well
-        }
+        # Create the final result in the expected format. The raw scraped
+        # fields stay local; only the normalized profile is returned.
+        profile = LeetcodeProfile(
+            username=username,
+            total_solved=total_solved if isinstance(total_solved, int) else 0,
+            easy_solved=easy_solved,
+            medium_solved=medium_solved,
+            hard_solved=hard_solved,
+            ranking=ranking,
+            contest_rating=contest_rating,
+            topics=topics
+        )
+        result = profile.to_dict()
         
         # Output the result as JSON
         print(json.dumps(result))
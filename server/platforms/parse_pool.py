@@ -0,0 +1,84 @@
+import atexit
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# Payloads smaller than this are parsed in-process; handing them to a worker
+# costs more than parsing a few kilobytes of JSON/HTML.
+PARSE_POOL_MIN_BYTES = int(os.environ.get("PARSE_POOL_MIN_BYTES", 256 * 1024))
+
+# Size of the pool, fixed for the life of the process. Workers are started on
+# demand (forkserver/spawn pools grow as jobs arrive), up to this many.
+PARSE_POOL_WORKERS = max(1, int(os.environ.get("PARSE_POOL_WORKERS", os.cpu_count() or 1)))
+
+# Set PLATFORM_PARSE_INLINE=1 to disable the pool entirely (e.g. in restricted sandboxes)
+PARSE_INLINE = os.environ.get("PLATFORM_PARSE_INLINE") == "1"
+
+_pool = None
+# Only long-lived processes use the pool (see enable_parse_pool)
+_enabled = False
+
+def _pool_context():
+    # Workers must not be forked from a process that already runs threads (the
+    # download threads may hold the logging or ssl locks mid-request, and a
+    # forked child would inherit them locked). forkserver forks workers from a
+    # clean single-threaded server process; spawn is the portable fallback.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+def enable_parse_pool():
+    """
+    Lets submit_parse use the process pool. Meant for long-lived processes
+    (job_worker.py), where a worker's startup and its copy of the problemset
+    are paid once and reused by every job; a one-shot script run would spend
+    more starting a worker than it saves, so it parses inline.
+    """
+    global _enabled
+    _enabled = not PARSE_INLINE
+
+def get_parse_pool():
+    """
+    Returns the shared process pool used for CPU-bound parsing, creating it on
+    first use with PARSE_POOL_WORKERS workers.
+    Returns None if the pool is not enabled or cannot be started in this environment.
+    """
+    global _pool
+    if _pool is None and _enabled:
+        try:
+            _pool = ProcessPoolExecutor(max_workers=PARSE_POOL_WORKERS, mp_context=_pool_context())
+            atexit.register(_pool.shutdown)
+        except (OSError, NotImplementedError, ValueError) as e:
+            logging.warning(f"Process pool unavailable, parsing inline: {e}")
+            return None
+    return _pool
+
+def submit_parse(fn, payload, *args):
+    """
+    Schedules `fn(payload, *args)` on the parse pool.
+
+    `payload` should be the raw response body (bytes/str) rather than a decoded
+    structure: bytes cross the process boundary as a single buffer copy, while
+    the (much smaller) normalized result is the only thing pickled back.
+    Small payloads, and processes that haven't enabled the pool, run inline.
+
+    Returns:
+        A concurrent.futures.Future resolving to the parse result.
+    """
+    pool = None
+    if payload is not None and len(payload) >= PARSE_POOL_MIN_BYTES:
+        pool = get_parse_pool()
+
+    if pool is not None:
+        try:
+            return pool.submit(fn, payload, *args)
+        except RuntimeError as e:
+            # Pool was shut down or a worker died; fall back to parsing here
+            logging.warning(f"Parse pool rejected job, parsing inline: {e}")
+
+    future = Future()
+    try:
+        future.set_result(fn(payload, *args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
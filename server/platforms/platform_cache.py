@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+
+# Directory for state the platform scripts keep between runs (cursors, snapshots, ...)
+CACHE_DIR = os.environ.get(
+    "PLATFORM_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+
+def cache_path(name):
+    """Returns the absolute path of a file inside the platform cache directory."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
+
+def load_json(name, default=None):
+    """
+    Loads a JSON document from the cache directory.
+
+    Returns `default` if the file is missing or unreadable.
+    """
+    try:
+        with open(cache_path(name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json(name, data):
+    """
+    Atomically writes a JSON document to the cache directory, so concurrent
+    readers never see a half-written file.
+    """
+    path = cache_path(name)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
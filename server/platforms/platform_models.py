@@ -0,0 +1,205 @@
+import sys
+from array import array
+from dataclasses import dataclass, field
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+class TagVocabulary:
+    """
+    Process-wide mapping between tag names and small integer ids.
+
+    Every profile shares the same interned name strings and stores its tag
+    counts positionally, instead of repeating the names in its own dict.
+    """
+    __slots__ = ("_ids", "_names")
+
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+
+    def id_for(self, name):
+        tag_id = self._ids.get(name)
+        if tag_id is None:
+            name = sys.intern(name)
+            tag_id = len(self._names)
+            self._ids[name] = tag_id
+            self._names.append(name)
+        return tag_id
+
+    def find(self, name):
+        """Returns the id of a known tag, or None without registering it."""
+        return self._ids.get(name)
+
+    def name_for(self, tag_id):
+        return self._names[tag_id]
+
+    def __len__(self):
+        return len(self._names)
+
+TAGS = TagVocabulary()
+
+class TagCounts:
+    """Per-profile solve counts stored in an array indexed by TagVocabulary id."""
+    __slots__ = ("_counts",)
+
+    def __init__(self):
+        self._counts = array('I')
+
+    @classmethod
+    def from_dict(cls, mapping):
+        counts = cls()
+        for name, count in mapping.items():
+            counts[name] = count
+        return counts
+
+    def __getitem__(self, name):
+        tag_id = TAGS.find(name)
+        return self._counts[tag_id] if tag_id is not None and tag_id < len(self._counts) else 0
+
+    def __setitem__(self, name, count):
+        tag_id = TAGS.id_for(name)
+        if tag_id >= len(self._counts):
+            self._counts.extend([0] * (tag_id + 1 - len(self._counts)))
+        self._counts[tag_id] = count
+
+    def items(self):
+        return ((TAGS.name_for(tag_id), count) for tag_id, count in enumerate(self._counts) if count)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __reduce__(self):
+        # Ids are only meaningful within one process's vocabulary, so pickle
+        # by name (results travel back from parse pool workers)
+        return (TagCounts.from_dict, (self.to_dict(),))
+
+@dataclass(slots=True)
+class LeetcodeProfile:
+    username: str
+    total_solved: int = 0
+    easy_solved: int = 0
+    medium_solved: int = 0
+    hard_solved: int = 0
+    ranking: int = 0
+    contest_rating: int = 0
+    topics: TagCounts = field(default_factory=TagCounts)
+
+    def to_dict(self):
+        """Serializes to the LeetcodeUserData shape in shared/schema.ts."""
+        return {
+            "username": self.username,
+            "totalSolved": self.total_solved,
+            "easySolved": self.easy_solved,
+            "mediumSolved": self.medium_solved,
+            "hardSolved": self.hard_solved,
+            "ranking": self.ranking,
+            "contestRating": self.contest_rating,
+            "topicData": self.topics.to_dict()
+        }
+
+@dataclass(slots=True)
+class CodeforcesContestResult:
+    contest_id: int
+    contest_name: str
+    rank: int
+    rating_change: int
+
+    def to_dict(self):
+        return {
+            "contestId": self.contest_id,
+            "contestName": self.contest_name,
+            "rank": self.rank,
+            "ratingChange": self.rating_change
+        }
+
+@dataclass(slots=True)
+class CodeforcesProfile:
+    handle: str
+    total_solved: int = 0
+    rating: int = 0
+    max_rank: str = "Newbie"
+    level_ab: int = 0
+    level_cd: int = 0
+    level_e: int = 0
+    contests: tuple = ()
+    topics: TagCounts = field(default_factory=TagCounts)
+
+    def to_dict(self):
+        """Serializes to the CodeforcesUserData shape in shared/schema.ts."""
+        return {
+            "handle": self.handle,
+            "totalSolved": self.total_solved,
+            "rating": self.rating,
+            "maxRank": self.max_rank,
+            "levelAB": self.level_ab,
+            "levelCD": self.level_cd,
+            "levelE": self.level_e,
+            "contests": [contest.to_dict() for contest in self.contests],
+            "topicData": self.topics.to_dict()
+        }
+
+@dataclass(slots=True)
+class GFGProfile:
+    username: str
+    total_solved: int = 0
+    institution_rank: int = 0
+    school: int = 0
+    basic: int = 0
+    easy: int = 0
+    medium_hard: int = 0
+    # Indexed like MONTHS
+    monthly_activity: array = field(default_factory=lambda: array('I', [0] * len(MONTHS)))
+    weekly_activity: dict = field(default_factory=dict)
+    current_streak: int = 0
+    max_streak: int = 0
+    daily_start: str = None
+    daily_counts: array = field(default_factory=lambda: array('H'))
+
+    def to_dict(self):
+        """Serializes to the GFGUserData shape in shared/schema.ts."""
+        return {
+            "username": self.username,
+            "totalSolved": self.total_solved,
+            "institutionRank": self.institution_rank,
+            "school": self.school,
+            "basic": self.basic,
+            "easy": self.easy,
+            "mediumHard": self.medium_hard,
+            "monthlyActivity": dict(zip(MONTHS, self.monthly_activity)),
+            "weeklyActivity": self.weekly_activity,
+            "currentStreak": self.current_streak,
+            "maxStreak": self.max_streak,
+            "dailyActivity": {
+                "start": self.daily_start,
+                "counts": self.daily_counts.tolist()
+            }
+        }
+
+@dataclass(slots=True)
+class Contest:
+    id: str
+    platform: str
+    name: str
+    url: str
+    start_time_iso: str
+    end_time_iso: str
+    duration_seconds: int
+    status: str
+
+    def __post_init__(self):
+        # A handful of distinct values shared by every contest
+        self.platform = sys.intern(self.platform)
+        self.status = sys.intern(self.status)
+
+    def to_dict(self):
+        """Serializes to the contest shape emitted by contest_fetcher.py."""
+        return {
+            "id": self.id,
+            "platform": self.platform,
+            "name": self.name,
+            "url": self.url,
+            "start_time_iso": self.start_time_iso,
+            "end_time_iso": self.end_time_iso,
+            "duration_seconds": self.duration_seconds,
+            "status": self.status
+        }
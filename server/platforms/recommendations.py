@@ -0,0 +1,323 @@
+import heapq
+import json
+import os
+import sqlite3
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+from platform_cache import cache_path, load_json, save_json
+
+RECOMMENDATIONS_DB = "recommendations.sqlite"
+# Precomputed candidate index per platform, keyed by the catalog version it was built from
+INDEX_FILE = "candidate_index_{platform}.json"
+
+# How many recommendations are cached per user; requests for more recompute
+CACHED_RECOMMENDATIONS = 25
+# A cached list is recomputed once new solves drop it below this size
+MIN_CACHED_RECOMMENDATIONS = 10
+# Rating changes smaller than this keep the cached list
+RATING_TOLERANCE = 50
+
+# Recommend problems slightly above the user's level
+TARGET_OFFSET = 100
+WINDOW_BELOW = 300
+WINDOW_ABOVE = 400
+# Only the user's weakest tags are searched
+WEAK_TAG_LIMIT = 8
+
+DEFAULT_RATING = {"codeforces": 1200, "leetcode": 1500}
+
+# LeetCode's catalog has no ratings or tags, so difficulties are placed on the
+# Codeforces-like scale and double as the problems' only tag (the user's
+# per-difficulty solve counts then play the role of tag counts)
+LEETCODE_DIFFICULTY_RATING = {"Easy": 1200, "Medium": 1600, "Hard": 2000}
+
+# Codeforces problems that need special judges/languages/interaction; never recommended
+EXCLUDED_TAGS = {"*special"}
+
+_indexes = {}
+
+class CandidateIndex:
+    """Per-tag candidate lists of (rating, problem id), sorted by rating for windowed scans."""
+    __slots__ = ("by_tag",)
+
+    def __init__(self, problems):
+        """
+        Args:
+            problems: Iterable of (problem id, rating, tags, order) for every
+                      recommendable problem. Within a rating, problems with a
+                      lower `order` come first and win ties.
+        """
+        buckets = {}
+        for pid, rating, tags, order in problems:
+            if EXCLUDED_TAGS.intersection(tags):
+                continue
+            for tag in tags or ("",):
+                buckets.setdefault(tag, []).append((rating, order, pid))
+
+        self.by_tag = {}
+        for tag, entries in buckets.items():
+            entries.sort()
+            self.by_tag[tag] = ([rating for rating, _, _ in entries], [pid for _, _, pid in entries])
+
+    @classmethod
+    def from_dict(cls, by_tag):
+        """Rebuilds an index saved with to_dict, without re-sorting the catalog."""
+        index = cls.__new__(cls)
+        index.by_tag = {tag: (ratings, ids) for tag, (ratings, ids) in by_tag.items()}
+        return index
+
+    def to_dict(self):
+        return {tag: [ratings, ids] for tag, (ratings, ids) in self.by_tag.items()}
+
+def _catalog_version(platform):
+    """Identifies the catalog contents an index is built from, or None if there is no catalog."""
+    if platform == "codeforces":
+        from codeforces_problemset import snapshot_version
+        return snapshot_version()
+    from leetcode_api import CATALOG_PATH
+    try:
+        return str(os.stat(CATALOG_PATH).st_mtime_ns)
+    except OSError:
+        return None
+
+def _catalog_problems(platform):
+    if platform == "codeforces":
+        from codeforces_problemset import get_problemset
+        return (
+            (pid, rating, tags, 0)
+            for pid, (rating, tags) in get_problemset(auto_refresh=False).items()
+            if rating
+        )
+
+    from leetcode_api import load_problem_catalog
+    # Lower question numbers (the well-known classics) come first within a difficulty
+    return (
+        (slug, LEETCODE_DIFFICULTY_RATING.get(entry["difficulty"], 1600), (entry["difficulty"],),
+         int(entry["questionNumber"]) if entry["questionNumber"].isdigit() else 0)
+        for slug, entry in load_problem_catalog().items()
+        if not entry.get("premium") and entry["difficulty"] in LEETCODE_DIFFICULTY_RATING
+    )
+
+def get_candidate_index(platform):
+    """
+    Returns the candidate index for a platform's problem catalog.
+
+    The index is built once per catalog version and saved to the cache
+    directory, so script runs load the precomputed lists instead of sorting
+    the catalog again. A stale Codeforces snapshot is used as is (profile
+    fetches and the problemset refresh keep it current); only a missing one
+    is downloaded here.
+    """
+    if platform not in DEFAULT_RATING:
+        raise ValueError(f"Unsupported platform: {platform}")
+
+    if platform == "codeforces":
+        from codeforces_problemset import get_problemset, snapshot_version
+        if snapshot_version() is None:
+            get_problemset()
+
+    version = _catalog_version(platform)
+    cached = _indexes.get(platform)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    name = INDEX_FILE.format(platform=platform)
+    saved = load_json(name, None)
+    if version is not None and saved and saved.get("version") == version:
+        index = CandidateIndex.from_dict(saved["byTag"])
+    else:
+        index = CandidateIndex(_catalog_problems(platform))
+        if version is not None:
+            save_json(name, {"version": version, "byTag": index.to_dict()})
+
+    _indexes[platform] = (version, index)
+    return index
+
+def tag_weights(index, tag_counts):
+    """
+    Scores how much each tag needs practice.
+
+    A tag holding x% of the catalog's (problem, tag) pairs "expects" x% of the
+    user's tag counts; the weight grows the further the user falls short of
+    that share, and is scaled by the tag's size, so that with no or sparse
+    tag data the broad topics (not niche ones) are the weakest.
+    """
+    sizes = {tag: len(ids) for tag, (_, ids) in index.by_tag.items()}
+    catalog_total = sum(sizes.values()) or 1
+    largest = max(sizes.values(), default=1)
+    user_total = sum(tag_counts.values())
+
+    weights = {}
+    for tag, size in sizes.items():
+        expected = user_total * size / catalog_total
+        shortfall = (expected + 1) / (tag_counts.get(tag, 0) + 1)
+        weights[tag] = shortfall * (size / largest) ** 0.5
+    return weights
+
+def rank_problems(index, solved, tag_counts, rating, k):
+    """
+    Returns the top-k unsolved (problem id, score) pairs for a user.
+
+    Candidates come from the user's weakest tags (see tag_weights), within a
+    rating window around rating + TARGET_OFFSET. Weaker tags and closer
+    ratings score higher.
+    """
+    target = rating + TARGET_OFFSET
+    weights = tag_weights(index, tag_counts)
+    weak_tags = heapq.nlargest(WEAK_TAG_LIMIT, weights, key=weights.get)
+
+    best = {}
+    for tag in weak_tags:
+        weight = weights[tag]
+        ratings, ids = index.by_tag[tag]
+        lo = bisect_left(ratings, target - WINDOW_BELOW)
+        hi = bisect_right(ratings, target + WINDOW_ABOVE)
+        for i in range(lo, hi):
+            pid = ids[i]
+            if pid in solved:
+                continue
+            score = weight / (1 + abs(ratings[i] - target) / 100)
+            if score > best.get(pid, 0):
+                best[pid] = score
+
+    return heapq.nlargest(k, best.items(), key=itemgetter(1))
+
+def _connect():
+    conn = sqlite3.connect(cache_path(RECOMMENDATIONS_DB))
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_key TEXT PRIMARY KEY,
+            rating INTEGER,
+            tag_counts TEXT NOT NULL DEFAULT '{}',
+            solved TEXT NOT NULL DEFAULT '[]',
+            recs TEXT,
+            updated_at REAL
+        ) WITHOUT ROWID
+    """)
+    return conn
+
+def _user_key(platform, username):
+    return f"{platform}:{username.lower()}"
+
+def get_solved(platform, username):
+    """Returns the set of problem ids recorded as solved for a user."""
+    with _connect() as conn:
+        row = conn.execute("SELECT solved FROM users WHERE user_key = ?", (_user_key(platform, username),)).fetchone()
+    return set(json.loads(row[0])) if row else set()
+
+def update_user_state(platform, username, solved=None, new_solves=(), rating=None, tag_counts=None):
+    """
+    Records a user's solves and stats, invalidating cached recommendations incrementally.
+
+    Args:
+        solved: The complete solved set, if known (replaces the stored set).
+        new_solves: Problem ids solved since the last update (added to the stored set).
+        rating: Current rating on the platform, if known.
+        tag_counts: Current {tag: solved count}, if known.
+
+    Newly solved problems are removed from the cached list; it is only dropped
+    (and recomputed on the next read) when it runs short or the rating moved.
+    """
+    key = _user_key(platform, username)
+    with _connect() as conn:
+        # Take the write lock before reading, so concurrent updates can't drop each other's solves
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT rating, tag_counts, solved, recs FROM users WHERE user_key = ?", (key,)).fetchone()
+        old_rating, old_tags, old_solved, recs = row if row else (None, "{}", "[]", None)
+
+        old_solved = set(json.loads(old_solved))
+        new_solved = set(solved) if solved is not None else set(old_solved)
+        new_solved.update(new_solves)
+        added = new_solved - old_solved
+
+        recs = json.loads(recs) if recs else None
+        if recs is not None and added:
+            recs = [rec for rec in recs if rec["id"] not in added]
+        if recs is not None and len(recs) < MIN_CACHED_RECOMMENDATIONS:
+            recs = None
+        if rating is not None and old_rating is not None and abs(rating - old_rating) >= RATING_TOLERANCE:
+            recs = None
+
+        conn.execute(
+            "INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                rating if rating is not None else old_rating,
+                json.dumps(tag_counts) if tag_counts is not None else old_tags,
+                json.dumps(sorted(new_solved)),
+                json.dumps(recs) if recs is not None else None,
+                time.time()
+            )
+        )
+    return added
+
+def _describe(platform, ranked):
+    """Attaches titles/links/difficulty to ranked (problem id, score) pairs."""
+    if platform == "codeforces":
+        from codeforces_problemset import get_problem_details
+        details = get_problem_details(pid for pid, _ in ranked)
+    else:
+        from leetcode_api import load_problem_catalog
+        catalog = load_problem_catalog()
+        details = {
+            pid: {"title": catalog[pid]["title"], "link": catalog[pid]["link"], "difficulty": catalog[pid]["difficulty"]}
+            for pid, _ in ranked if pid in catalog
+        }
+
+    return [
+        {"id": pid, "score": round(score, 4), **details.get(pid, {})}
+        for pid, score in ranked
+    ]
+
+def get_recommendations(platform, username, k=10):
+    """
+    Returns up to k recommended unsolved problems for a user.
+
+    Served from the cached list when it is still valid; otherwise ranked from
+    the candidate index and cached for subsequent requests, unless the user's
+    state changed while ranking (the list would then be based on stale solves).
+    """
+    key = _user_key(platform, username)
+    with _connect() as conn:
+        row = conn.execute("SELECT rating, tag_counts, solved, recs, updated_at FROM users WHERE user_key = ?", (key,)).fetchone()
+
+    rating, tag_counts, solved, recs, updated_at = row if row else (None, "{}", "[]", None, None)
+    if recs:
+        recs = json.loads(recs)
+        if len(recs) >= k:
+            return recs[:k]
+
+    index = get_candidate_index(platform)
+    ranked = rank_problems(
+        index,
+        set(json.loads(solved)),
+        json.loads(tag_counts),
+        rating or DEFAULT_RATING[platform],
+        max(k, CACHED_RECOMMENDATIONS)
+    )
+    recs = _describe(platform, ranked)
+
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO users (user_key, rating, recs, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(user_key) DO UPDATE SET recs = excluded.recs, updated_at = excluded.updated_at "
+            "WHERE users.updated_at IS ?",
+            (key, rating, json.dumps(recs), time.time(), updated_at)
+        )
+    return recs[:k]
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(json.dumps({"error": "Usage: recommendations.py <leetcode|codeforces> <username> [k]"}))
+        sys.exit(1)
+
+    platform, username = sys.argv[1], sys.argv[2]
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    try:
+        result = {"platform": platform, "username": username, "recommendations": get_recommendations(platform, username, k)}
+    except ValueError as e:
+        result = {"error": str(e)}
+    print(json.dumps(result))
@@ -0,0 +1,44 @@
+import { exec } from "child_process";
+import { promisify } from "util";
+
+const execAsync = promisify(exec);
+
+export interface ProblemRecommendation {
+  id: string;
+  score: number;
+  title?: string;
+  link?: string;
+  rating?: number;
+  difficulty?: string;
+  tags?: string[];
+}
+
+/**
+ * Returns the top-k recommended unsolved problems for a user.
+ * Served from the per-user cache maintained by recommendations.py; only
+ * recomputed after new solves exhaust the cached list.
+ *
+ * @param platform "leetcode" or "codeforces"
+ * @param username The user's handle on that platform
+ * @param k Number of problems to return
+ */
+export async function fetchRecommendations(
+  platform: "leetcode" | "codeforces",
+  username: string,
+  k: number = 10
+): Promise<ProblemRecommendation[]> {
+  const { stdout, stderr } = await execAsync(
+    `python3 server/platforms/recommendations.py ${platform} "${username}" ${k}`
+  );
+  
+  if (stderr) {
+    console.log("Recommendations debug info:", stderr);
+  }
+  
+  const result = JSON.parse(stdout);
+  if (result.error) {
+    throw new Error(`Recommendations error: ${result.error}`);
+  }
+  
+  return result.recommendations;
+}
@@ -2,11 +2,15 @@ import type { Express } from "express";
 import { createServer, type Server } from "http";
 import { setupAuth } from "./auth";
 import { storage } from "./storage";
-import { fetchLeetcodeData } from "./platforms/leetcode";
-import { fetchCodeforcesData } from "./platforms/codeforces";
+import { commitLeetcodeCursor, fetchLeetcodeData, fetchLeetcodeRecentAccepted } from "./platforms/leetcode";
+import { fetchCodeforcesData, pollCodeforcesStandings, CodeforcesStandingsRow } from "./platforms/codeforces";
 import { fetchGFGData } from "./platforms/geeksforgeeks";
+import { sendProfile } from "./platforms/fingerprint";
 import { searchLeetCodeQuestions } from "./data/leetcode-questions";
 import { searchCodeForcesQuestions } from "./data/codeforces-questions";
+import { fetchRecommendations } from "./platforms/recommendations";
+import { enqueueRefreshJob, getJob, JOB_KINDS, JobKind } from "./platforms/jobs";
+import { contestFeedPath, hasContestFeeds, pendingContestRefresh, readUpcomingContests, startContestRefreshTimer } from "./platforms/contests";
 import { 
   insertQuestionListSchema,
   insertQuestionSchema,
@@ -25,15 +29,17 @@ import {
   insertTestSubmissionSchema
 } from "@shared/schema";
 import { z } from "zod";
-import { exec } from "child_process";
-import { promisify } from "util";
-import path from "path";
+import fs from "fs";
 
-const execPromise = promisify(exec);
+// Rows of each polled contest standings snapshot, patched with the changed rows of each poll
+const standingsCache = new Map<string, { version: number; rows: Map<string, CodeforcesStandingsRow> }>();
 
 export async function registerRoutes(app: Express): Promise<Server> {
   // Sets up auth routes: /api/register, /api/login, /api/logout, /api/user
   setupAuth(app);
+  
+  // Contest feeds are refreshed in the background; the contest endpoints only read them
+  startContestRefreshTimer();
 
   // Platform data fetching endpoints
   app.get("/api/fetch/leetcode/:username", async (req, res, next) => {
@@ -53,7 +59,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
         });
       }
       
-      res.json(data);
+      sendProfile(req, res, data);
     } catch (error) {
       next(error);
     }
@@ -72,7 +78,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
       }
       
       const data = await fetchLeetcodeData(username);
-      res.json(data);
+      sendProfile(req, res, data);
     } catch (error) {
       next(error);
     }
@@ -90,7 +96,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
       }
       
       const data = await fetchCodeforcesData(username);
-      res.json(data);
+      sendProfile(req, res, data);
     } catch (error) {
       next(error);
     }
@@ -108,7 +114,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
       }
       
       const data = await fetchGFGData(username);
-      res.json(data);
+      sendProfile(req, res, data);
     } catch (error) {
       next(error);
     }
@@ -131,7 +137,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
         });
       }
       
-      res.json(data);
+      sendProfile(req, res, data);
     } catch (error) {
       next(error);
     }
@@ -154,7 +160,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
         });
       }
       
-      res.json(data);
+      sendProfile(req, res, data);
     } catch (error) {
       next(error);
     }
@@ -393,6 +399,103 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
   
+  // Marks list questions as solved from the user's new LeetCode accepted submissions
+  app.post("/api/questions/sync/leetcode", async (req, res, next) => {
+    try {
+      if (!req.isAuthenticated()) return res.status(401).json({ message: "Unauthorized" });
+      
+      const username = req.user!.leetcodeUsername;
+      if (!username) {
+        return res.status(404).json({ message: "LeetCode username not linked to account" });
+      }
+      
+      const recent = await fetchLeetcodeRecentAccepted(username);
+      // All known solves, so questions added to a list after an earlier sync still match
+      const solvedSlugs = new Set(recent.solvedSlugs);
+      
+      const updated = [];
+      if (solvedSlugs.size > 0) {
+        const lists = await storage.getQuestionLists(req.user!.id);
+        for (const list of lists) {
+          const questions = await storage.getQuestionsInList(list.id);
+          for (const question of questions) {
+            const slug = question.url.match(/leetcode\.com\/problems\/([^/?#]+)/)?.[1];
+            if (!question.isSolved && slug && solvedSlugs.has(slug)) {
+              updated.push(await storage.markQuestionSolved(question.id, true));
+            }
+          }
+        }
+      }
+      
+      // Test progress: a new accepted submission made while a joined test ran
+      // counts as a correct submission for the matching test question
+      const testSubmissions = [];
+      if (recent.newSubmissions.length > 0) {
+        for (const participation of await storage.getUserTestParticipations(req.user!.id)) {
+          const test = await storage.getPrivateTest(participation.testId);
+          if (!test) continue;
+          
+          const windowStart = new Date(test.startTime).getTime() / 1000;
+          const windowEnd = windowStart + test.durationMinutes * 60;
+          const solvedAt = new Map<string, number>();
+          for (const submission of recent.newSubmissions) {
+            if (submission.timestamp >= windowStart && submission.timestamp <= windowEnd) {
+              solvedAt.set(submission.titleSlug, submission.timestamp);
+            }
+          }
+          if (solvedAt.size === 0) continue;
+          
+          const alreadyCorrect = new Set(
+            (await storage.getUserTestSubmissions(test.id, req.user!.id))
+              .filter(submission => submission.isCorrect)
+              .map(submission => submission.questionId)
+          );
+          for (const question of await storage.getTestQuestions(test.id)) {
+            const slug = question.url.match(/leetcode\.com\/problems\/([^/?#]+)/)?.[1];
+            if (slug && solvedAt.has(slug) && !alreadyCorrect.has(question.id)) {
+              testSubmissions.push(await storage.addTestSubmission(req.user!.id, {
+                testId: test.id,
+                questionId: question.id,
+                isCorrect: true
+              }));
+            }
+          }
+        }
+      }
+      
+      // Only advance the cursor once the solves are recorded; if anything above
+      // throws, the next sync returns the same submissions again
+      await commitLeetcodeCursor(username, recent.cursor);
+      
+      res.json({ cursor: recent.cursor, newSubmissions: recent.newSubmissions, updated, testSubmissions });
+    } catch (error) {
+      next(error);
+    }
+  });
+  
+  // Next problems to solve, ranked from the user's solved set and weak tags
+  app.get("/api/recommendations/:platform", async (req, res, next) => {
+    try {
+      if (!req.isAuthenticated()) return res.status(401).json({ message: "Unauthorized" });
+      
+      const platform = req.params.platform;
+      if (platform !== "leetcode" && platform !== "codeforces") {
+        return res.status(400).json({ message: "Unsupported platform" });
+      }
+      
+      const username = platform === "leetcode" ? req.user!.leetcodeUsername : req.user!.codeforcesUsername;
+      if (!username) {
+        return res.status(404).json({ message: `${platform} username not linked to account` });
+      }
+      
+      const k = Math.min(Math.max(parseInt(req.query.k as string) || 10, 1), 50);
+      const recommendations = await fetchRecommendations(platform, username, k);
+      res.json(recommendations);
+    } catch (error) {
+      next(error);
+    }
+  });
+  
   // LeetCode questions database endpoint
   app.get("/api/leetcode/questions", async (req, res, next) => {
     try {
@@ -488,6 +591,97 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
   
+  // Pre-rendered contest feeds (?platforms=leetcode,codeforces). Never triggers upstream fetches.
+  app.get("/api/contests/feed.:format(json|ics)", async (req, res, next) => {
+    try {
+      const format = req.params.format as "json" | "ics";
+      const platforms = typeof req.query.platforms === "string" ? req.query.platforms.split(",") : [];
+      const feedPath = contestFeedPath(platforms, format);
+      
+      if (!fs.existsSync(feedPath)) {
+        return res.status(404).json({ message: "Contest feed not generated yet" });
+      }
+      
+      res.type(format === "ics" ? "text/calendar" : "application/json");
+      res.set("Cache-Control", "public, max-age=300");
+      res.sendFile(feedPath);
+    } catch (error) {
+      next(error);
+    }
+  });
+  
+  // Endpoint to fetch upcoming contests from all platforms
+  app.get("/api/contests/upcoming", async (req, res, next) => {
+    try {
+      // Serve the last rendered feed, even if a refresh is running or failed.
+      // Only right after startup, before any feed exists, wait for the first refresh.
+      const firstRefresh = pendingContestRefresh();
+      if (firstRefresh && !hasContestFeeds()) {
+        await firstRefresh;
+      }
+      const contestsData = readUpcomingContests();
+      
+      // Store relevant contests in the database for tracking participation
+      for (const contest of contestsData) {
+        try {
+          // Check if contest already exists by matching platform and name
+          const existingContests = await storage.getContests();
+          const exists = existingContests.some(c => 
+            c.platform.toLowerCase() === contest.platform.toLowerCase() && 
+            c.name === contest.name
+          );
+          
+          if (!exists) {
+            // Create a new contest record
+            const startTime = new Date(contest.start_time_iso);
+            
+            // Only add if it's a valid date
+            if (isNaN(startTime.getTime())) continue;
+            
+            const contestData: ContestCreateData = {
+              name: contest.name,
+              platform: contest.platform.toLowerCase() === 'leetcode' ? 'leetcode' :
+                        contest.platform.toLowerCase() === 'codeforces' ? 'codeforces' : 'gfg',
+              url: contest.url,
+              startTime: startTime,
+              durationSeconds: contest.duration_seconds || 7200 // Default to 2 hours if not specified
+            };
+            
+            await storage.createContest(contestData);
+          }
+        } catch (err) {
+          console.error("Error processing contest:", err);
+          // Continue with next contest
+        }
+      }
+      
+      res.json({
+        success: true,
+        message: "Contests fetched and saved successfully",
+        count: contestsData.length
+      });
+    } catch (error) {
+      console.error("Error in contests/upcoming endpoint:", error);
+      
+      // Fallback to database contests
+      try {
+        const contests = await storage.getContests();
+        const formattedContests = contests.map(contest => ({
+          ...contest,
+          startTime: contest.startTime.toISOString()
+        }));
+        
+        res.json({
+          success: false,
+          message: "Failed to fetch fresh contests. Using existing data.",
+          contests: formattedContests
+        });
+      } catch (storageError) {
+        next(storageError);
+      }
+    }
+  });
+
   app.get("/api/contests/:id", async (req, res, next) => {
     try {
       const contestId = parseInt(req.params.id);
@@ -579,135 +773,55 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
   
-  // Endpoint to fetch upcoming contests from all platforms
-  app.get("/api/contests/upcoming", async (req, res, next) => {
+  // Queue a background refresh; any job_worker.py process picks it up
+  app.post("/api/jobs/:kind", async (req, res, next) => {
     try {
-      const pythonPath = path.join(process.cwd(), 'server', 'platforms', 'contest_fetcher.py');
-      let contestsData;
+      if (!req.isAuthenticated()) return res.status(401).json({ message: "Unauthorized" });
       
-      try {
-        // Run the Python script to fetch contest data
-        const { stdout, stderr } = await execPromise(`python ${pythonPath}`);
-        
-        if (stderr && stderr.length > 0) {
-          console.error("Error running contest fetcher script:", stderr);
-        }
-        
-        // Parse the results from stdout
-        contestsData = JSON.parse(stdout);
-      } catch (pythonError) {
-        console.warn("Failed to run Python contest fetcher, using demo data", pythonError);
-        
-        // Demo data with realistic contest information
-        const now = new Date();
-        const tomorrow = new Date(now);
-        tomorrow.setDate(tomorrow.getDate() + 1);
-        
-        const nextWeek = new Date(now);
-        nextWeek.setDate(nextWeek.getDate() + 7);
-        
-        contestsData = [
-          {
-            name: "Weekly Contest 392",
-            platform: "leetcode",
-            url: "https://leetcode.com/contest/weekly-contest-392",
-            start_time: tomorrow.toISOString(),
-            duration_seconds: 5400
-          },
-          {
-            name: "Biweekly Contest 123",
-            platform: "leetcode",
-            url: "https://leetcode.com/contest/biweekly-contest-123",
-            start_time: nextWeek.toISOString(),
-            duration_seconds: 5400
-          },
-          {
-            name: "Codeforces Round #927 (Div. 3)",
-            platform: "codeforces",
-            url: "https://codeforces.com/contests/1927",
-            start_time: tomorrow.toISOString(),
-            duration_seconds: 7200
-          },
-          {
-            name: "Educational Codeforces Round 169",
-            platform: "codeforces",
-            url: "https://codeforces.com/contests/1928",
-            start_time: nextWeek.toISOString(),
-            duration_seconds: 7200
-          },
-          {
-            name: "GFG Weekly Coding Contest",
-            platform: "gfg",
-            url: "https://practice.geeksforgeeks.org/contest/gfg-weekly-coding-contest",
-            start_time: tomorrow.toISOString(),
-            duration_seconds: 5400
-          }
-        ];
+      const kind = req.params.kind as JobKind;
+      if (!JOB_KINDS.includes(kind)) {
+        return res.status(400).json({ message: "Unknown job kind" });
       }
       
-      // Store relevant contests in the database for tracking participation
-      for (const contest of contestsData) {
-        try {
-          // Check if contest already exists by matching platform and name
-          const existingContests = await storage.getContests();
-          const exists = existingContests.some(c => 
-            c.platform.toLowerCase() === contest.platform.toLowerCase() && 
-            c.name === contest.name
-          );
-          
-          if (!exists) {
-            // Create a new contest record
-            // Handle different formats between real API data and demo data
-            const startTimeStr = contest.start_time_iso || contest.start_time;
-            const startTime = new Date(startTimeStr);
-            
-            // Only add if it's a valid date
-            if (isNaN(startTime.getTime())) continue;
-            
-            const contestData: ContestCreateData = {
-              name: contest.name,
-              platform: contest.platform.toLowerCase() === 'leetcode' ? 'leetcode' :
-                        contest.platform.toLowerCase() === 'codeforces' ? 'codeforces' : 'gfg',
-              url: contest.url,
-              startTime: startTime,
-              durationSeconds: contest.duration_seconds || 7200 // Default to 2 hours if not specified
-            };
-            
-            await storage.createContest(contestData);
-          }
-        } catch (err) {
-          console.error("Error processing contest:", err);
-          // Continue with next contest
+      let username: string | null | undefined;
+      if (kind !== "contests") {
+        const linked = {
+          leetcode: req.user!.leetcodeUsername,
+          codeforces: req.user!.codeforcesUsername,
+          gfg: req.user!.gfgUsername
+        };
+        username = req.body?.username || linked[kind];
+        if (!username) {
+          return res.status(400).json({ message: "Username is required" });
         }
       }
       
-      res.json({
-        success: true,
-        message: "Contests fetched and saved successfully",
-        count: contestsData.length
-      });
+      const id = await enqueueRefreshJob(kind, username ?? undefined);
+      res.status(202).json({ id });
     } catch (error) {
-      console.error("Error in contests/upcoming endpoint:", error);
+      next(error);
+    }
+  });
+  
+  app.get("/api/jobs/:jobId", async (req, res, next) => {
+    try {
+      if (!req.isAuthenticated()) return res.status(401).json({ message: "Unauthorized" });
+      
+      const jobId = parseInt(req.params.jobId);
+      if (isNaN(jobId)) {
+        return res.status(400).json({ message: "Invalid job ID" });
+      }
       
-      // Fallback to database contests
       try {
-        const contests = await storage.getContests();
-        const formattedContests = contests.map(contest => ({
-          ...contest,
-          startTime: contest.startTime.toISOString()
-        }));
-        
-        res.json({
-          success: false,
-          message: "Failed to fetch fresh contests. Using existing data.",
-          contests: formattedContests
-        });
-      } catch (storageError) {
-        next(storageError);
+        res.json(await getJob(jobId));
+      } catch (error) {
+        res.status(404).json({ message: (error as Error).message });
       }
+    } catch (error) {
+      next(error);
     }
   });
-
+  
   // Group management endpoints
   app.post("/api/groups", async (req, res, next) => {
     try {
@@ -1252,6 +1366,102 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
+  // Live leaderboard for a test's Codeforces questions, from one contest.standings call per contest
+  app.get("/api/tests/:testId/standings", async (req, res, next) => {
+    try {
+      if (!req.isAuthenticated()) return res.status(401).json({ message: "Unauthorized" });
+      
+      const testId = parseInt(req.params.testId);
+      if (isNaN(testId)) {
+        return res.status(400).json({ message: "Invalid test ID" });
+      }
+      
+      const test = await storage.getPrivateTest(testId);
+      if (!test) {
+        return res.status(404).json({ message: "Test not found" });
+      }
+      
+      const member = await storage.getGroupMember(test.groupId, req.user!.id);
+      if (!member) {
+        return res.status(403).json({ message: "You don't have access to this test" });
+      }
+      
+      // Codeforces questions grouped by contest: /contest/1850/problem/B or /problemset/problem/1850/B
+      const questionsByContest = new Map<number, { questionId: number; index: string; points: number }[]>();
+      for (const question of await storage.getTestQuestions(testId)) {
+        const match = question.url.match(/codeforces\.com\/(?:contest\/(\d+)\/problem|problemset\/problem\/(\d+))\/([A-Za-z]\d*)/);
+        if (!match) continue;
+        const contestId = parseInt(match[1] || match[2]);
+        const entries = questionsByContest.get(contestId) || [];
+        entries.push({ questionId: question.id, index: match[3].toUpperCase(), points: question.points });
+        questionsByContest.set(contestId, entries);
+      }
+      
+      const handleToUser = new Map<string, { userId: number; username: string }>();
+      for (const groupMember of await storage.getGroupMembers(test.groupId)) {
+        const user = await storage.getUser(groupMember.userId);
+        if (user?.codeforcesUsername) {
+          handleToUser.set(user.codeforcesUsername.toLowerCase(), { userId: user.id, username: user.username });
+        }
+      }
+      
+      const handles = Array.from(handleToUser.keys()).sort();
+      if (handles.length === 0) {
+        return res.json({ versions: {}, leaderboard: [] });
+      }
+      
+      // Only solves made while the test ran count, not earlier practice or virtual submissions
+      const windowStart = Math.floor(new Date(test.startTime).getTime() / 1000);
+      const windowEnd = windowStart + test.durationMinutes * 60;
+      
+      const scores = new Map<number, { userId: number; username: string; points: number; solved: number[] }>();
+      handleToUser.forEach(({ userId, username }) => scores.set(userId, { userId, username, points: 0, solved: [] }));
+      
+      const versions: Record<number, number> = {};
+      for (const [contestId, questions] of Array.from(questionsByContest.entries())) {
+        const cacheKey = `${contestId}:${handles.join(";")}`;
+        let cached = standingsCache.get(cacheKey);
+        
+        const poll = await pollCodeforcesStandings(contestId, handles, cached?.version ?? 0);
+        if (!cached || poll.full) {
+          cached = { version: 0, rows: new Map() };
+          standingsCache.set(cacheKey, cached);
+        }
+        for (const key of poll.removed) cached.rows.delete(key);
+        for (const row of poll.changed) cached.rows.set(`${row.handle}:${row.participantType}`, row);
+        cached.version = poll.version;
+        versions[contestId] = poll.version;
+        
+        // A problem counts once per user, whichever way (contest, virtual, practice) it was solved
+        const solvedByHandle = new Map<string, Set<string>>();
+        cached.rows.forEach(row => {
+          const solved = solvedByHandle.get(row.handle.toLowerCase()) || new Set<string>();
+          for (const [index, solvedAt] of Object.entries(row.solvedAt ?? {})) {
+            if (solvedAt >= windowStart && solvedAt <= windowEnd) solved.add(index);
+          }
+          solvedByHandle.set(row.handle.toLowerCase(), solved);
+        });
+        
+        solvedByHandle.forEach((solved, handle) => {
+          const user = handleToUser.get(handle);
+          if (!user) return;
+          const score = scores.get(user.userId)!;
+          for (const question of questions) {
+            if (solved.has(question.index)) {
+              score.points += question.points;
+              score.solved.push(question.questionId);
+            }
+          }
+        });
+      }
+      
+      const leaderboard = Array.from(scores.values()).sort((a, b) => b.points - a.points);
+      res.json({ versions, leaderboard });
+    } catch (error) {
+      next(error);
+    }
+  });
+
   app.post("/api/tests/:testId/submit", async (req, res, next) => {
     try {
       if (!req.isAuthenticated()) return res.status(401).json({ message: "Unauthorized" });
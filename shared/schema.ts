@@ -139,6 +139,21 @@ export interface LeetcodeUserData {
   detailedData?: any; // Optional detailed data from the scraper
 }
 
+export interface LeetcodeRecentSubmissions {
+  username: string;
+  cursor: number; // Unix timestamp of the newest processed submission
+  newSubmissions: Array<{
+    id: string;
+    titleSlug: string;
+    title: string;
+    timestamp: number;
+    questionNumber: string | null;
+    difficulty: string | null;
+    link: string;
+  }>;
+  solvedSlugs: string[]; // Every slug known to be solved, including earlier syncs
+}
+
 export interface CodeforcesUserData {
   handle: string;
   totalSolved: number;
@@ -153,6 +168,7 @@ export interface CodeforcesUserData {
     rank: number;
     ratingChange: number;
   }>;
+  topicData?: Record<string, number>; // Solved problems per tag
 }
 
 export interface GFGUserData {
@@ -164,6 +180,13 @@ export interface GFGUserData {
   easy: number;
   mediumHard: number;
   monthlyActivity: Record<string, number>;
+  weeklyActivity?: Record<string, number>;
+  currentStreak?: number;
+  maxStreak?: number;
+  dailyActivity?: {
+    start: string | null; // ISO date of counts[0]
+    counts: number[];
+  };
 }
 
 export interface CompareData {